@@ -81,9 +81,335 @@ class CarTypeFactory:
             return SedanFactory()
         return None 
 # Client Code 
-cartype1 = CarTypeFactory.getCarType("SUV") # We create a "SUV" car
-car1 = cartype1.getCar("RangeRover") # In "SUV" car type, we create a "RangeRover" car
-car1.display() # Prints "This is a RangeRover SUV"
-cartype2 = CarTypeFactory.getCarType("Sedan") # We create a "Sedan" car 
-car2 = cartype2.getCar("Audi") # In "Sedan" car type, we create a "Audi" car 
-car2.display() # Prints "This is a Audi Sedan"
\ No newline at end of file
+if __name__ == "__main__":
+    cartype1 = CarTypeFactory.getCarType("SUV") # We create a "SUV" car
+    car1 = cartype1.getCar("RangeRover") # In "SUV" car type, we create a "RangeRover" car
+    car1.display() # Prints "This is a RangeRover SUV"
+    cartype2 = CarTypeFactory.getCarType("Sedan") # We create a "Sedan" car 
+    car2 = cartype2.getCar("Audi") # In "Sedan" car type, we create a "Audi" car 
+    car2.display() # Prints "This is a Audi Sedan"
+ 
+###################################################################################################################
+ 
+# The problem with the above code is that every call to CarTypeFactory.getCarType() creates a new
+# SUVFactory() or SedanFactory() object, even though these factories have no state of their own.
+# And then every getCar() call runs one more if-chain of string comparisons. So for creating one
+# car we allocate a factory object and do two rounds of string comparisons.
+# So here we create each sub-factory only once and cache it, and we also keep a flattened index
+# keyed by (type, company) which goes straight to the concrete car class.
+ 
+# Cached Abstract Factory
+ 
+class SUVFactory:
+    __cars = {"RangeRover": RangeRoverSUV, "Volvo": VolvoSUV} # company -> concrete SUV car class
+    @staticmethod
+    def getCar(company = None):
+        car = SUVFactory.__cars.get(company)
+        return car() if car is not None else None
+    # Returns all the (company, concrete car class) pairs this factory knows about
+    @staticmethod
+    def getCars():
+        return SUVFactory.__cars.items()
+ 
+class SedanFactory:
+    __cars = {"Benz": BenzSedan, "Audi": AudiSedan} # company -> concrete Sedan car class
+    @staticmethod
+    def getCar(company = None):
+        car = SedanFactory.__cars.get(company)
+        return car() if car is not None else None
+    @staticmethod
+    def getCars():
+        return SedanFactory.__cars.items()
+ 
+class CarTypeFactory:
+    # Each sub-factory object is created only once, when the class is defined, and the same
+    # object is returned on every getCarType() call.
+    __factories = {"SUV": SUVFactory(), "Sedan": SedanFactory()}
+    # Flattened index, (type, company) -> concrete car class, built once from the sub-factories.
+    __index = {
+        (type, company): car
+        for type, factory in __factories.items()
+        for company, car in factory.getCars()
+    }
+    @staticmethod
+    def getCarType(type = None):
+        return CarTypeFactory.__factories.get(type)
+    # This skips the sub-factory completely and creates the concrete car with one dictionary lookup.
+    @staticmethod
+    def getCar(type = None, company = None):
+        car = CarTypeFactory.__index.get((type, company))
+        return car() if car is not None else None
+    # Creates cars for a list of (type, company) pairs. The pairs are grouped by key first, so each
+    # key is looked up once and then all the cars of that key are created together in a batch.
+    # The cars are returned in the same order as the pairs.
+    @staticmethod
+    def bulk_create(pairs):
+        groups = {}
+        for position, pair in enumerate(pairs):
+            groups.setdefault(pair, []).append(position)
+        cars = [None] * len(pairs)
+        for pair, positions in groups.items():
+            car = CarTypeFactory.__index.get(pair)
+            if car is None:
+                continue
+            for position in positions:
+                cars[position] = car()
+        return cars
+ 
+# Client Code 
+if __name__ == "__main__":
+    cartype1 = CarTypeFactory.getCarType("SUV") # We get the cached "SUV" factory
+    print(cartype1 is CarTypeFactory.getCarType("SUV")) # Prints True, the same factory object is returned every time
+    car1 = cartype1.getCar("RangeRover")
+    car1.display() # Prints "This is a RangeRover SUV"
+    car2 = CarTypeFactory.getCar("Sedan", "Audi") # Directly create a "Sedan" car of "Audi" company
+    car2.display() # Prints "This is a Audi Sedan"
+    for car in CarTypeFactory.bulk_create([("SUV", "Volvo"), ("Sedan", "Benz"), ("SUV", "Volvo")]):
+        car.display() # Prints "This is a Volvo SUV", "This is a Benz Sedan", "This is a Volvo SUV"
+ 
+###################################################################################################################
+ 
+# In all the code above, adding a new car model means writing a new concrete class and a new entry (or a new
+# "if company == ..." branch) in SUVFactory or SedanFactory. If we have thousands of models, which are only
+# different in their data (name, number of seats ...), we would rather describe them in a config file:
+#
+#     {"SUV":   {"defaults": {"seats": 5}, "products": {"RangeRover": {"seats": 7}, "Volvo": {}}},
+#      "Sedan": {"defaults": {"seats": 4}, "products": {"Benz": {}, "Audi": {}}}}
+#
+# CompiledCarFactory reads such a spec (here from JSON, a YAML file would give the same dictionaries) and
+# compiles it once at startup: every product becomes its own concrete CarInterface class, with its values
+# stored on the class, and all the classes go into the same kind of (type, company) dispatch table as our
+# cached CarTypeFactory. When the spec changes, reload() only recompiles the products which changed.
+# The values of the spec become class attributes, so a value named e.g. "display", "carType" or "__init__"
+# would replace a part of the class itself. The spec is checked before anything is compiled, and such names
+# (and every name starting with "_") are rejected with a ValueError.
+ 
+# Config driven Abstract Factory
+ 
+import json, time
+ 
+class CompiledCarFactory:
+    # Names a value of the spec cannot have, the attributes every compiled class already has
+    RESERVED = frozenset(dir(CarInterface)) | {"carType", "company", "display"}
+    def __init__(self, spec = None):
+        self.__specs = {} # (type, company) -> values of that product after applying the defaults
+        self.__index = {} # (type, company) -> compiled concrete car class
+        self.__families = {} # type -> {company -> compiled concrete car class}
+        if spec is not None:
+            self.reload(spec)
+    # Creates a concrete car class for one product. The values are class attributes, so they are stored
+    # once per model and not once per car object.
+    @staticmethod
+    def __compile(carType, company, values):
+        message = f"This is a {company} {carType}"
+        attributes = dict(values, __slots__ = (), __module__ = __name__, carType = carType, company = company, display = lambda self: print(message))
+        return type(f"{company}{carType}", (CarInterface,), attributes)
+    # Compiles the products of the spec which are new or changed, and removes the ones which are not in the spec anymore.
+    # Returns the number of products which were compiled.
+    def reload(self, spec):
+        specs = {}
+        for type, family in spec.items():
+            defaults = family.get("defaults", {})
+            for company, values in family.get("products", {}).items():
+                specs[(type, company)] = dict(defaults, **values)
+                CompiledCarFactory.__check(type, company, specs[(type, company)])
+        compiled = 0
+        for key, values in specs.items():
+            if self.__specs.get(key) != values:
+                self.__index[key] = CompiledCarFactory.__compile(key[0], key[1], values)
+                self.__families.setdefault(key[0], {})[key[1]] = self.__index[key]
+                compiled += 1
+        for key in self.__specs.keys() - specs.keys():
+            del self.__index[key]
+            del self.__families[key[0]][key[1]]
+            if not self.__families[key[0]]: # The last product of this type is gone, so the type is gone too
+                del self.__families[key[0]]
+        self.__specs = specs
+        return compiled
+    @staticmethod
+    def __check(carType, company, values):
+        for name in values:
+            if not isinstance(name, str) or not name.isidentifier() or name.startswith("_") or name in CompiledCarFactory.RESERVED:
+                raise ValueError(f"{company} {carType}: {name!r} cannot be used as the name of a value, it is not a public identifier or it is reserved")
+    @staticmethod
+    def fromJson(text):
+        return CompiledCarFactory(json.loads(text))
+    # Returns a factory for one car type, which has the same getCar() method as SUVFactory and SedanFactory
+    def getCarType(self, type = None):
+        cars = self.__families.get(type)
+        return CompiledFamilyFactory(cars) if cars is not None else None
+    def getCar(self, type = None, company = None):
+        car = self.__index.get((type, company))
+        return car() if car is not None else None
+ 
+class CompiledFamilyFactory:
+    def __init__(self, cars):
+        self.__cars = cars # company -> compiled concrete car class, shared with CompiledCarFactory
+    def getCar(self, company = None):
+        car = self.__cars.get(company)
+        return car() if car is not None else None
+
+# Client Code 
+if __name__ == "__main__":
+    spec = """{
+        "SUV":   {"defaults": {"seats": 5}, "products": {"RangeRover": {"seats": 7}, "Volvo": {}}},
+        "Sedan": {"defaults": {"seats": 4}, "products": {"Benz": {}, "Audi": {}}}
+    }"""
+    factory = CompiledCarFactory.fromJson(spec)
+    car1 = factory.getCarType("SUV").getCar("RangeRover")
+    car1.display() # Prints "This is a RangeRover SUV"
+    print(car1.seats) # Prints "7"
+    car2 = factory.getCar("Sedan", "Audi")
+    car2.display() # Prints "This is a Audi Sedan"
+    print(car2.seats) # Prints "4", the default of the "Sedan" family
+    changed = json.loads(spec)
+    changed["Sedan"]["products"]["Audi"] = {"seats": 5} # Only Audi changes
+    changed["Sedan"]["products"]["Skoda"] = {} # And a new model is added
+    print(factory.reload(changed)) # Prints "2", only Audi and Skoda are compiled again
+    print(factory.getCar("Sedan", "Audi").seats) # Prints "5"
+    try:
+        factory.reload({"SUV": {"products": {"Volvo": {"display": "fast"}}}})
+    except ValueError as error:
+        print(error) # Prints "Volvo SUV: 'display' cannot be used as the name of a value, it is not a public identifier or it is reserved"
+    del changed["SUV"] # Every SUV is removed, so there is no SUV factory anymore
+    factory.reload(changed)
+    print(factory.getCarType("SUV")) # Prints "None"
+ 
+    # Now lets compile a spec with 10000 models and time it, and then time the lookups
+    bigSpec = {f"Type{t}": {"defaults": {"seats": 4}, "products": {f"Company{c}": {"doors": c % 5} for c in range(100)}} for t in range(100)}
+    start = time.perf_counter()
+    bigFactory = CompiledCarFactory(bigSpec)
+    print(f"Compiling 10000 models: {time.perf_counter() - start:.3f}s")
+    start = time.perf_counter()
+    for i in range(100000):
+        bigFactory.getCar("Type99", "Company99")
+    print(f"getCar() with 10000 models: {(time.perf_counter() - start) * 1e9 / 100000:.0f}ns per call")
+    bigSpec["Type0"]["products"]["Company0"] = {"doors": 4}
+    start = time.perf_counter()
+    bigFactory.reload(bigSpec)
+    print(f"Reloading after changing 1 model: {time.perf_counter() - start:.3f}s")
+ 
+###################################################################################################################
+ 
+# Same as in our Factory example, SUVFactory, SedanFactory and CarTypeFactory take free form strings, and a typo
+# like CarTypeFactory.getCar("Sedan", "Adui") returns None, which only fails later when we call display() on it.
+# So here the car types and the companies become typed keys (IntEnum), defined once in design_patterns/keys.py
+# and shared by all our factories. The strings are parsed into keys once, at the boundary of the program, and a
+# wrong string fails right there with a clear error. As the keys are small integers, each factory is a plain list
+# indexed by the key, and CarTypeFactory keeps the lists of both sub-factories, indexed [type][company]. Like in
+# our Factory example this is about as fast as the cached string factories, not faster, the gain is the errors.
+ 
+# Key based Abstract Factory
+ 
+import os, sys, timeit
+try:
+    from design_patterns.keys import CarType, Company, invalidKey, missingProduct
+except ImportError: # This file is run directly, so the repository root is not on sys.path yet
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    from design_patterns.keys import CarType, Company, invalidKey, missingProduct
+ 
+# Builds the dispatch array of one car type, index Company -> concrete car class
+def companyDispatch(carType, cars):
+    return [cars.get(company, missingProduct(carType.name, company)) for company in Company]
+ 
+class KeyedSUVFactory:
+    __cars = companyDispatch(CarType.SUV, {Company.RangeRover: RangeRoverSUV, Company.Volvo: VolvoSUV})
+    # company must be a Company (or its integer value), so use Company.parse() for strings. As in KeyedShapeFactory
+    # only a negative key needs its own check, a key which is too big or not a number fails when indexing.
+    @staticmethod
+    def getCar(company):
+        try:
+            constructor = KeyedSUVFactory.__cars[company] if company >= 0 else None
+        except (IndexError, TypeError):
+            constructor = None
+        if constructor is None:
+            invalidKey(Company, company)
+        return constructor()
+    @staticmethod
+    def getCars():
+        return KeyedSUVFactory.__cars
+ 
+class KeyedSedanFactory:
+    __cars = companyDispatch(CarType.Sedan, {Company.Benz: BenzSedan, Company.Audi: AudiSedan})
+    @staticmethod
+    def getCar(company):
+        try:
+            constructor = KeyedSedanFactory.__cars[company] if company >= 0 else None
+        except (IndexError, TypeError):
+            constructor = None
+        if constructor is None:
+            invalidKey(Company, company)
+        return constructor()
+    @staticmethod
+    def getCars():
+        return KeyedSedanFactory.__cars
+ 
+class KeyedCarTypeFactory:
+    __factories = [KeyedSUVFactory(), KeyedSedanFactory()] # Index CarType -> cached sub-factory
+    __cars = [factory.getCars() for factory in __factories] # Index [type][company] -> concrete car class
+    @staticmethod
+    def getCarType(type):
+        try:
+            factory = KeyedCarTypeFactory.__factories[type] if type >= 0 else None
+        except (IndexError, TypeError):
+            factory = None
+        if factory is None:
+            invalidKey(CarType, type)
+        return factory
+    @staticmethod
+    def getCar(type, company):
+        try:
+            constructor = KeyedCarTypeFactory.__cars[type][company] if type >= 0 and company >= 0 else None
+        except (IndexError, TypeError):
+            constructor = None
+        if constructor is None:
+            KeyedCarTypeFactory.__invalid(type, company)
+        return constructor()
+    @staticmethod
+    def bulk_create(pairs):
+        allCars = KeyedCarTypeFactory.__cars
+        cars = []
+        for type, company in pairs:
+            try:
+                constructor = allCars[type][company] if type >= 0 and company >= 0 else None
+            except (IndexError, TypeError):
+                constructor = None
+            if constructor is None:
+                KeyedCarTypeFactory.__invalid(type, company)
+            cars.append(constructor())
+        return cars
+    @staticmethod
+    def __invalid(type, company):
+        invalidKey(CarType, type)
+        invalidKey(Company, company)
+    # Parses external (type, company) strings into keys, this is the only place where strings are compared
+    @staticmethod
+    def parse(type, company):
+        return CarType.parse(type), Company.parse(company)
+ 
+# Client Code 
+if __name__ == "__main__":
+    suv, volvo = KeyedCarTypeFactory.parse("SUV", "Volvo") # Parsed once, when the strings enter our program
+    KeyedCarTypeFactory.getCarType(suv).getCar(volvo).display() # Prints "This is a Volvo SUV"
+    KeyedCarTypeFactory.getCar(CarType.Sedan, Company.Audi).display() # Prints "This is a Audi Sedan"
+    for car in KeyedCarTypeFactory.bulk_create([(CarType.SUV, Company.RangeRover), (CarType.Sedan, Company.Benz)]):
+        car.display() # Prints "This is a RangeRover SUV", "This is a Benz Sedan"
+    try:
+        KeyedCarTypeFactory.parse("Sedan", "Adui")
+    except ValueError as error:
+        print(error) # Prints "Unknown Company 'Adui', expected one of: RangeRover, Volvo, Benz, Audi"
+    try:
+        KeyedCarTypeFactory.getCar(CarType.SUV, Company.Benz)
+    except LookupError as error:
+        print(error) # Prints "No SUV is registered for Benz"
+    try:
+        KeyedCarTypeFactory.getCar(CarType.SUV, 6)
+    except ValueError as error:
+        print(error) # Prints "6 is not a valid Company"
+ 
+    # Now lets compare the string keys of our cached CarTypeFactory with the integer keys
+    pairs = [("SUV", "Volvo"), ("Sedan", "Audi")] * 50
+    keyPairs = [KeyedCarTypeFactory.parse(type, company) for type, company in pairs]
+    stringTime = timeit.timeit(lambda: [CarTypeFactory.getCar(type, company) for type, company in pairs], number = 2000)
+    integerTime = timeit.timeit(lambda: [KeyedCarTypeFactory.getCar(type, company) for type, company in keyPairs], number = 2000)
+    print(f"getCar() -> string keys: {stringTime:.4f}s, integer keys: {integerTime:.4f}s")
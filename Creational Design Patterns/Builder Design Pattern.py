@@ -68,21 +68,22 @@ class HouseBuilder:
         return House(self)
     
 # Client Code 
-one_story_builder = HouseBuilder() # We first create a house builder object
-# Then we set our stories to 2 on this house builder object which will be step 1 and store the builder object 
-# which will be returned in one_story_build_step_1
-one_story_build_step_1 = one_story_builder.setStories(2) 
-# Then we set our door type to "Black" on this house builder object which will be step 2 and store the builder 
-# object which will be returned in one_story_build_step_2
-one_story_build_step_2 = one_story_build_step_1.setDoorType("Black")
-# Then we set our roof type to "Pointy" on this house builder object which will be step 3 and store the builder 
-# object which will be returned in our one_story_step_3
-one_story_build_step_3 = one_story_build_step_2.setRoofType("Pointy")
-# Finally we build a house by calling our build() method of our one_story_build_step_3 builder object, which 
-# will return a House object with all the parameters equal to our one_story_build_step_3 builder object.
-one_story_house = one_story_build_step_3.build() # This will give a House object with all parameter values equal to our builder object
-print(isinstance(one_story_house, House))# And remember this is a House object not a House builder object you can check with 'isinstance()' method
-# The above line will print True.
+if __name__ == "__main__":
+    one_story_builder = HouseBuilder() # We first create a house builder object
+    # Then we set our stories to 2 on this house builder object which will be step 1 and store the builder object 
+    # which will be returned in one_story_build_step_1
+    one_story_build_step_1 = one_story_builder.setStories(2) 
+    # Then we set our door type to "Black" on this house builder object which will be step 2 and store the builder 
+    # object which will be returned in one_story_build_step_2
+    one_story_build_step_2 = one_story_build_step_1.setDoorType("Black")
+    # Then we set our roof type to "Pointy" on this house builder object which will be step 3 and store the builder 
+    # object which will be returned in our one_story_step_3
+    one_story_build_step_3 = one_story_build_step_2.setRoofType("Pointy")
+    # Finally we build a house by calling our build() method of our one_story_build_step_3 builder object, which 
+    # will return a House object with all the parameters equal to our one_story_build_step_3 builder object.
+    one_story_house = one_story_build_step_3.build() # This will give a House object with all parameter values equal to our builder object
+    print(isinstance(one_story_house, House))# And remember this is a House object not a House builder object you can check with 'isinstance()' method
+    # The above line will print True.
  
 '''
 And as you can see in the client there are several build steps involved to build a 
@@ -145,23 +146,24 @@ class Director:
 
  
 # Client code 
-builder_obj = HouseBuilder() # First we create a builder object which will responsible for building our House  
-director_obj = Director(builder_obj) # Then we have a director object, which will take our builder object and 
-# and using this director object we can build one story or two story houses.
-house1 = director_obj.build_one_story_house() # So for building a one story house we can simply call the 
-# "build_one_story_house()" method in our Director class using our director object.
-print(house1.stories) # Prints "2"
-print(house1.door_type) # Prints "Black"
-print(house1.roof_type) # Prints "Pointy"
-print(isinstance(house1, House)) # And remember this is a House object not a House builder object you can check with 'isinstance()' method
-# The above line will print True.
-house2 = director_obj.build_two_story_house() # And for building a two story house we can simply call the 
-# "build_two_story_house()" method in our Director class using our director object
-print(house2.stories) # Prints "3"
-print(house2.door_type) # Prints "White"
-print(house2.roof_type) # Prints "Flat"
-print(isinstance(house2, House)) # And remember this is a House object not a House builder object you can check with 'isinstance()' method
-# The above line will print True.
+if __name__ == "__main__":
+    builder_obj = HouseBuilder() # First we create a builder object which will responsible for building our House  
+    director_obj = Director(builder_obj) # Then we have a director object, which will take our builder object and 
+    # and using this director object we can build one story or two story houses.
+    house1 = director_obj.build_one_story_house() # So for building a one story house we can simply call the 
+    # "build_one_story_house()" method in our Director class using our director object.
+    print(house1.stories) # Prints "2"
+    print(house1.door_type) # Prints "Black"
+    print(house1.roof_type) # Prints "Pointy"
+    print(isinstance(house1, House)) # And remember this is a House object not a House builder object you can check with 'isinstance()' method
+    # The above line will print True.
+    house2 = director_obj.build_two_story_house() # And for building a two story house we can simply call the 
+    # "build_two_story_house()" method in our Director class using our director object
+    print(house2.stories) # Prints "3"
+    print(house2.door_type) # Prints "White"
+    print(house2.roof_type) # Prints "Flat"
+    print(isinstance(house2, House)) # And remember this is a House object not a House builder object you can check with 'isinstance()' method
+    # The above line will print True.
  
 '''
 So this way Director is really helpful in managing specific builder which are responsible for building specific
@@ -185,4 +187,450 @@ The difference between builder Design pattern and decorator design pattern are:
                 object.                               |
                                                       |
  
-'''
\ No newline at end of file
+'''
+ 
+###################################################################################################################
+ 
+# Every House object and every HouseBuilder object above keeps its stories, door_type and roof_type
+# in its own "__dict__" (a dictionary per object). If we keep millions of houses in memory, these
+# dictionaries take much more memory than the three values themselves.
+# Python lets us declare the fields of a class using "__slots__". Then the object stores its fields
+# in fixed slots instead of a dictionary, which makes each object smaller and attribute access faster.
+ 
+# Compact House and HouseBuilder using __slots__
+ 
+import time, tracemalloc
+from array import array
+ 
+DictHouse, DictHouseBuilder = House, HouseBuilder # Keep our previous classes for comparison
+ 
+class House:
+    __slots__ = ("stories", "door_type", "roof_type")
+    def __init__(self, builder):
+        self.stories = builder.stories 
+        self.door_type = builder.door_type
+        self.roof_type = builder.roof_type
+ 
+class HouseBuilder:
+    __slots__ = ("stories", "door_type", "roof_type")
+    def __init__(self):
+        self.stories = None 
+        self.door_type = None 
+        self.roof_type = None 
+    def setStories(self, stories):
+        self.stories = stories 
+        return self 
+    def setDoorType(self, doorType):
+        self.door_type = doorType 
+        return self 
+    def setRoofType(self, roofType):
+        self.roof_type = roofType 
+        return self 
+    def build(self):
+        return House(self)
+ 
+# And if we only need the values of the houses and not separate House objects, we can store all the 
+# houses column by column, i.e. one array for stories, one for door types and one for roof types.
+# Door and roof types repeat a lot, so instead of storing the string for every house, each distinct 
+# string is stored once and the house only stores its small integer code.
+class HouseBatch:
+    def __init__(self):
+        self.stories = array("H") # unsigned 2 byte integers
+        self.door_codes = array("B") # unsigned 1 byte integers, index into door_types
+        self.roof_codes = array("B") # unsigned 1 byte integers, index into roof_types
+        self.door_types = [] # code -> door type string
+        self.roof_types = []
+        self.__door_index = {} # door type string -> code
+        self.__roof_index = {}
+    # Returns the integer code of a value, adding the value to the table if it is new.
+    # A code is 1 byte, so a column can have at most 256 distinct values.
+    @staticmethod
+    def __code(value, table, index):
+        code = index.get(value)
+        if code is None:
+            if len(table) > 255:
+                raise ValueError(f"HouseBatch stores at most 256 distinct values per column, cannot add {value!r}")
+            code = index[value] = len(table)
+            table.append(value)
+        return code
+    # Adds one house using the current values of a builder. Both codes are computed before any column grows,
+    # and stories is the only append which can still fail, so a failed add never leaves the columns with
+    # different lengths.
+    def add(self, builder):
+        doorCode = HouseBatch.__code(builder.door_type, self.door_types, self.__door_index)
+        roofCode = HouseBatch.__code(builder.roof_type, self.roof_types, self.__roof_index)
+        self.stories.append(builder.stories)
+        self.door_codes.append(doorCode)
+        self.roof_codes.append(roofCode)
+    # Adds n copies of the same house, the codes are looked up once and each column grows in one step
+    def addMany(self, builder, n):
+        doorCode = HouseBatch.__code(builder.door_type, self.door_types, self.__door_index)
+        roofCode = HouseBatch.__code(builder.roof_type, self.roof_types, self.__roof_index)
+        stories = array("H", [builder.stories]) * n
+        self.stories.extend(stories)
+        self.door_codes.extend(array("B", [doorCode]) * n)
+        self.roof_codes.extend(array("B", [roofCode]) * n)
+    def __len__(self):
+        return len(self.stories)
+    # Creates a House object for the house at the given position
+    def get(self, i):
+        builder = HouseBuilder().setStories(self.stories[i]).setDoorType(self.door_types[self.door_codes[i]])
+        return builder.setRoofType(self.roof_types[self.roof_codes[i]]).build()
+ 
+# Client code 
+if __name__ == "__main__":
+    house3 = HouseBuilder().setStories(2).setDoorType("Black").setRoofType("Pointy").build()
+    print(house3.stories, house3.door_type, house3.roof_type) # Prints "2 Black Pointy"
+    batch = HouseBatch()
+    batch.add(HouseBuilder().setStories(2).setDoorType("Black").setRoofType("Pointy"))
+    batch.add(HouseBuilder().setStories(3).setDoorType("White").setRoofType("Flat"))
+    print(batch.get(1).roof_type) # Prints "Flat"
+ 
+    # Now lets compare the memory used per house and the number of houses built per second.
+    # DictHouseBuilder.build() looks up the name "House" when it runs, which is now our __slots__ House,
+    # so for the first row we create DictHouse objects directly.
+    count = 100000
+    def measure(name, buildAll):
+        tracemalloc.start()
+        start = time.perf_counter()
+        houses = buildAll()
+        elapsed = time.perf_counter() - start
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{name}: {size / count:.1f} bytes per house, {count / elapsed:,.0f} houses per second")
+ 
+    def buildDictHouses():
+        builder = DictHouseBuilder().setStories(2).setDoorType("Black").setRoofType("Pointy")
+        return [DictHouse(builder) for i in range(count)]
+    def buildSlotHouses():
+        builder = HouseBuilder().setStories(2).setDoorType("Black").setRoofType("Pointy")
+        return [builder.build() for i in range(count)]
+    def buildHouseBatch():
+        builder = HouseBuilder().setStories(2).setDoorType("Black").setRoofType("Pointy")
+        houses = HouseBatch()
+        for i in range(count):
+            houses.add(builder)
+        return houses
+ 
+    measure("__dict__ House", buildDictHouses)
+    measure("__slots__ House", buildSlotHouses)
+    measure("HouseBatch", buildHouseBatch)
+
+ 
+###################################################################################################################
+ 
+# Director above builds one house per call, and for every house it calls setStories(), setDoorType(),
+# setRoofType() and build() one after the other. If we need a million houses of the same recipe we
+# repeat all these steps a million times, even though the builder ends up with the same values every time.
+# So here the Director validates a recipe once, sets up a builder once, and then creates the houses
+# in bulk. The houses can be returned as a list, as a columnar HouseBatch, or lazily one by one.
+ 
+# Batch building using Director
+ 
+import itertools
+ 
+# Our compact HouseBuilder from above stays as it is, we only add validate() and build_batch() to it
+class HouseBuilder(HouseBuilder):
+    __slots__ = ()
+    # Checks that a (stories, door type, roof type) recipe can be used to build a house
+    # and raises a ValueError if it cannot.
+    @staticmethod
+    def validate(recipe):
+        stories, doorType, roofType = recipe
+        if not isinstance(stories, int) or stories < 1:
+            raise ValueError(f"stories must be a positive integer, got {stories!r}")
+        if not isinstance(doorType, str) or not isinstance(roofType, str):
+            raise ValueError(f"door type and roof type must be strings, got {doorType!r} and {roofType!r}")
+    # Builds one house for each (stories, door type, roof type) spec. Each distinct spec is validated
+    # and set on a builder only once, and that builder is reused for all the repeats of the spec.
+    @staticmethod
+    def build_batch(specs):
+        builders = {}
+        houses = []
+        for spec in specs:
+            builder = builders.get(spec)
+            if builder is None:
+                HouseBuilder.validate(spec)
+                builder = builders[spec] = HouseBuilder().setStories(spec[0]).setDoorType(spec[1]).setRoofType(spec[2])
+            houses.append(House(builder))
+        return houses
+ 
+class Director:
+    ONE_STORY_HOUSE = (2, "Black", "Pointy") # Recipe of our one story house
+    TWO_STORY_HOUSE = (3, "White", "Flat") # Recipe of our two story house
+    def __init__(self, builder):
+        self.builder = builder 
+    def build_one_story_house(self):
+        return self.__build(Director.ONE_STORY_HOUSE)
+    def build_two_story_house(self):
+        return self.__build(Director.TWO_STORY_HOUSE)
+    def __build(self, recipe):
+        stories, doorType, roofType = recipe
+        return self.builder.setStories(stories).setDoorType(doorType).setRoofType(roofType).build()
+    # Builds n houses of the same recipe. output can be:
+    # "list"     -> a list of n House objects
+    # "columnar" -> a HouseBatch, which stores the houses column by column without House objects
+    # "lazy"     -> an iterator which creates the House objects one at a time as we loop over it
+    # The recipe is validated once and set on a new builder, so our shared self.builder is not touched.
+    def build_many(self, recipe, n, output = "list"):
+        HouseBuilder.validate(recipe)
+        builder = HouseBuilder().setStories(recipe[0]).setDoorType(recipe[1]).setRoofType(recipe[2])
+        if output == "list":
+            return list(map(House, itertools.repeat(builder, n)))
+        if output == "columnar":
+            houses = HouseBatch()
+            houses.addMany(builder, n)
+            return houses
+        if output == "lazy":
+            return map(House, itertools.repeat(builder, n))
+        raise ValueError(f"unknown output {output!r}, expected 'list', 'columnar' or 'lazy'")
+ 
+# Client code 
+if __name__ == "__main__":
+    director_obj = Director(HouseBuilder())
+    houses = director_obj.build_many(Director.ONE_STORY_HOUSE, 3)
+    print(len(houses), houses[0].door_type) # Prints "3 Black"
+    batch = director_obj.build_many(Director.TWO_STORY_HOUSE, 3, output = "columnar")
+    print(len(batch), batch.get(0).roof_type) # Prints "3 Flat"
+    for house in director_obj.build_many(Director.ONE_STORY_HOUSE, 2, output = "lazy"):
+        print(house.stories) # Prints "2" two times, each house is created only when the loop asks for it
+    houses = HouseBuilder.build_batch([(2, "Black", "Pointy"), (3, "White", "Flat"), (2, "Black", "Pointy")])
+    print([house.roof_type for house in houses]) # Prints "['Pointy', 'Flat', 'Pointy']"
+ 
+    # Now lets compare building houses one by one with the Director against build_many().
+    # The "list" output still creates one House object per house, and creating the objects is most of the
+    # work, so it is only about 1.5-2x faster: it saves the three setX() calls per house, not the House.
+    # Only the "columnar" output, which creates no House objects at all, is more than 10x faster. So when
+    # a caller needs a big number of houses fast, it should take a HouseBatch and not a list.
+    count = 100000
+    start = time.perf_counter()
+    for i in range(count):
+        director_obj.build_one_story_house()
+    oneByOne = time.perf_counter() - start
+    for output in ("list", "columnar"):
+        start = time.perf_counter()
+        director_obj.build_many(Director.ONE_STORY_HOUSE, count, output = output)
+        elapsed = time.perf_counter() - start
+        print(f"build_many {output}: {oneByOne / elapsed:.1f}x faster than building one by one")
+ 
+###################################################################################################################
+ 
+# Our Director keeps one HouseBuilder and changes its values for every house it builds. So if two threads
+# call build_one_story_house() and build_two_story_house() at the same time on the same Director, one
+# thread can change the door type while the other thread is in the middle of building its house, and we
+# get a house with mixed values. The only way to use it safely from many threads is to put a lock around it.
+# Instead we can make the builder immutable, i.e. every setX() method returns a new builder with that one
+# value changed and the old builder stays exactly as it was. Then a builder can be shared between any number
+# of threads without a lock, and common steps like "2 stories + Black door" can be built once and reused
+# as a template for many houses.
+ 
+# Immutable (frozen) Builder
+ 
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import threading
+ 
+# namedtuple gives us an immutable object with stories, door_type and roof_type fields. Each setX() method
+# creates a new tuple which shares all the other values with the old one. We call tuple.__new__ directly
+# as it is much faster than namedtuple's _replace() method.
+class FrozenHouseBuilder(namedtuple("FrozenHouseBuilder", ["stories", "door_type", "roof_type"], defaults = [None, None, None])):
+    __slots__ = ()
+    def setStories(self, stories):
+        return tuple.__new__(FrozenHouseBuilder, (stories, self[1], self[2]))
+    def setDoorType(self, doorType):
+        return tuple.__new__(FrozenHouseBuilder, (self[0], doorType, self[2]))
+    def setRoofType(self, roofType):
+        return tuple.__new__(FrozenHouseBuilder, (self[0], self[1], roofType))
+    def build(self):
+        return House(self)
+ 
+class FrozenDirector:
+    # Templates, built only once and shared by every house and every thread
+    BLACK_DOOR_TEMPLATE = FrozenHouseBuilder().setStories(2).setDoorType("Black")
+    WHITE_DOOR_TEMPLATE = FrozenHouseBuilder().setStories(3).setDoorType("White")
+    def build_one_story_house(self):
+        return FrozenDirector.BLACK_DOOR_TEMPLATE.setRoofType("Pointy").build()
+    def build_two_story_house(self):
+        return FrozenDirector.WHITE_DOOR_TEMPLATE.setRoofType("Flat").build()
+ 
+# Client code 
+if __name__ == "__main__":
+    template = FrozenHouseBuilder().setStories(2).setDoorType("Black")
+    pointy = template.setRoofType("Pointy").build()
+    flat = template.setRoofType("Flat").build() # template is not changed by the previous line
+    print(pointy.roof_type, flat.roof_type, template.roof_type) # Prints "Pointy Flat None"
+ 
+    # Now lets build houses from many threads, first with our previous Director and a lock around it,
+    # and then with the FrozenDirector which does not need any lock.
+    # Note that with the GIL only one thread runs Python code at a time, so the lock is rarely contended
+    # and the frozen builder, which creates a new tuple for every step, may not be faster here. What we
+    # gain is that no thread ever waits on another one, and no house can get mixed values.
+    lock = threading.Lock()
+    lockedDirector = Director(HouseBuilder())
+    def buildLocked(n):
+        for i in range(n):
+            with lock:
+                lockedDirector.build_one_story_house()
+                lockedDirector.build_two_story_house()
+    frozenDirector = FrozenDirector()
+    def buildFrozen(n):
+        for i in range(n):
+            frozenDirector.build_one_story_house()
+            frozenDirector.build_two_story_house()
+ 
+    for name, buildHouses in (("lock + shared builder", buildLocked), ("frozen builder", buildFrozen)):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers = 8) as pool:
+            for future in [pool.submit(buildHouses, 10000) for i in range(8)]:
+                future.result()
+        print(f"{name}: {time.perf_counter() - start:.3f}s for 160000 houses from 8 threads")
+ 
+###################################################################################################################
+ 
+# Our Director builds a new House on every build_one_story_house() call, even though every one story house
+# is exactly the same (2 / Black / Pointy). If most of our build requests repeat a few hundred recipes, we
+# keep building the same houses again and again.
+# So here we cache the houses. The values of the builder (stories, door type, roof type) are the key of the
+# cache, i.e. the house is found by its content, and the same House object is returned for the same content.
+# As the same House object is now shared by many clients, it must not be changed, so the cached houses are
+# immutable (setting an attribute raises an AttributeError).
+# The cache holds at most maxSize houses and evicts one which was not used recently, it can also forget houses
+# after ttl seconds, and it counts hits and misses so that we can see whether caching really helps.
+ 
+# Memoizing Director
+ 
+import random
+from collections import OrderedDict
+ 
+class ImmutableHouse(House):
+    __slots__ = ()
+    def __init__(self, builder):
+        object.__setattr__(self, "stories", builder.stories)
+        object.__setattr__(self, "door_type", builder.door_type)
+        object.__setattr__(self, "roof_type", builder.roof_type)
+    def __setattr__(self, name, value):
+        raise AttributeError("A cached House is shared and cannot be changed")
+    def __delattr__(self, name):
+        raise AttributeError("A cached House is shared and cannot be changed")
+ 
+class HouseCache:
+    def __init__(self, maxSize = 1024, ttl = None):
+        self.maxSize = maxSize 
+        self.ttl = ttl # Seconds a house stays in the cache, None means until it is evicted
+        # (stories, door type, roof type) -> [house, time it was built, used since the last eviction scan]
+        self.__houses = OrderedDict() 
+        self.__lock = threading.Lock() # Only used while adding or evicting houses
+        self.hits = 0 # Updated without the lock, so it can be slightly off when many threads read at once
+        self.misses = 0 
+        self.evictions = 0 
+    # Returns the cached house of a (stories, door type, roof type) recipe, building it on a miss. The house is
+    # built from the recipe tuple itself and not from a builder, which another thread could change meanwhile.
+    # Same as our PrototypeRegistry, a hit is a single dictionary read without any lock. Instead of moving the
+    # house to the end of the LRU order (which would need the lock), a hit only marks the house as used.
+    def build(self, recipe):
+        key = tuple(recipe)
+        entry = self.__houses.get(key)
+        if entry is not None and (self.ttl is None or time.monotonic() - entry[1] < self.ttl):
+            entry[2] = True
+            self.hits += 1
+            return entry[0]
+        with self.__lock:
+            entry = self.__houses.get(key) # Another thread may have built it while we waited
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[1] < self.ttl):
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            house = ImmutableHouse(FrozenHouseBuilder(*key))
+            self.__houses[key] = [house, time.monotonic(), True]
+            while len(self.__houses) > self.maxSize:
+                self.__evict()
+            return house
+    # Second chance eviction, must be called with the lock held. The oldest house is evicted if it was not used
+    # since the last scan, otherwise it is marked as unused and moved to the end, and we look at the next one.
+    # This is close to least recently used, and each house is moved at most once per scan.
+    def __evict(self):
+        while True:
+            key, entry = self.__houses.popitem(last = False)
+            if not entry[2]:
+                self.evictions += 1
+                return
+            entry[2] = False
+            self.__houses[key] = entry
+    # Forgets one recipe, given as (stories, door type, roof type), or every house if no recipe is given
+    def invalidate(self, recipe = None):
+        with self.__lock:
+            if recipe is None:
+                self.__houses.clear()
+            else:
+                self.__houses.pop(tuple(recipe), None)
+    def hitRate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+ 
+# The recipes are passed straight to the cache, so the shared self.builder is never changed and the
+# MemoizingDirector can be used from many threads.
+class MemoizingDirector(Director):
+    def __init__(self, builder, cache = None):
+        super().__init__(builder)
+        self.cache = cache if cache is not None else HouseCache()
+    def build_one_story_house(self):
+        return self.cache.build(Director.ONE_STORY_HOUSE)
+    def build_two_story_house(self):
+        return self.cache.build(Director.TWO_STORY_HOUSE)
+    # Builds (or finds in the cache) the house of a (stories, door type, roof type) recipe
+    def build(self, recipe):
+        return self.cache.build(recipe)
+ 
+# Opt-in memoization for code which uses the builder directly: build() hashes the current state of the builder
+# into the cache key, so builders with the same values get the same shared ImmutableHouse.
+class MemoizingHouseBuilder(HouseBuilder):
+    __slots__ = ("cache",)
+    def __init__(self, cache = None):
+        super().__init__()
+        self.cache = cache if cache is not None else HouseCache()
+    def build(self):
+        return self.cache.build((self.stories, self.door_type, self.roof_type))
+ 
+# Client code 
+if __name__ == "__main__":
+    director_obj = MemoizingDirector(HouseBuilder())
+    house1 = director_obj.build_one_story_house() # Miss, the house is built and cached
+    house2 = director_obj.build_one_story_house() # Hit, the cached house is returned
+    print(house1 is house2) # Prints True
+    try:
+        house1.stories = 5
+    except AttributeError as error:
+        print(error) # Prints "A cached House is shared and cannot be changed"
+    director_obj.cache.invalidate(Director.ONE_STORY_HOUSE)
+    print(director_obj.build_one_story_house() is house1) # Prints False, the recipe was invalidated
+    print(director_obj.cache.hitRate()) # Prints "0.3333333333333333", 1 hit and 2 misses
+    builder = MemoizingHouseBuilder(director_obj.cache) # Shares the cache of the director
+    print(builder.setStories(3).setDoorType("White").setRoofType("Flat").build() is director_obj.build_two_story_house()) # Prints True
+ 
+    # Now lets build 100000 houses from 500 recipes, where a few recipes are asked for much more often than the
+    # others (Zipf distribution, the k-th most popular recipe is asked for about 1/k as often as the first one).
+    # A hit is cheaper than building a house, but a miss costs more (the lock, the immutable house, an eviction),
+    # so the cache only wins when it is big enough to hold the recipes which are really repeated: with 50 houses
+    # about half the requests miss and it is slower than no cache, with 500 houses every request hits and it is faster.
+    # The MemoizingHouseBuilder still makes the three setX() calls for every house and only replaces build(), so it
+    # is a little slower than no cache; what it saves is memory, as all the requests share 500 House objects.
+    recipes = [(stories, door, roof) for stories in range(1, 21) for door in ("Black", "White", "Red", "Blue", "Green")
+               for roof in ("Pointy", "Flat", "Dome", "Gable", "Hip")]
+    requests = random.Random(42).choices(recipes, weights = [1 / (k + 1) for k in range(len(recipes))], k = 100000)
+    plainDirector = Director(HouseBuilder())
+    start = time.perf_counter()
+    for recipe in requests:
+        plainDirector.builder.setStories(recipe[0]).setDoorType(recipe[1]).setRoofType(recipe[2]).build()
+    plain = time.perf_counter() - start
+    for maxSize in (50, 500):
+        memoizing = MemoizingDirector(HouseBuilder(), HouseCache(maxSize = maxSize))
+        start = time.perf_counter()
+        for recipe in requests:
+            memoizing.build(recipe)
+        elapsed = time.perf_counter() - start
+        print(f"cache of {maxSize}: hit rate {memoizing.cache.hitRate():.0%}, {elapsed:.3f}s, without cache {plain:.3f}s")
+    builder = MemoizingHouseBuilder(HouseCache(maxSize = 500))
+    start = time.perf_counter()
+    for recipe in requests:
+        builder.setStories(recipe[0]).setDoorType(recipe[1]).setRoofType(recipe[2]).build()
+    print(f"MemoizingHouseBuilder with a cache of 500: {time.perf_counter() - start:.3f}s, without cache {plain:.3f}s")
@@ -41,12 +41,13 @@ class Rectangle(ShapeInterface):
     def draw(self):
         print("Draw Rectangle")
 # Client Code 
-circleObj = Circle()
-circleObj.draw() # Prints "Draw Circle"
-squareObj = Square()
-squareObj.draw() # Prints "Draw Square"
-rectangleObj = Rectangle()
-rectangleObj.draw() # Prints "Draw Rectangle"
+if __name__ == "__main__":
+    circleObj = Circle()
+    circleObj.draw() # Prints "Draw Circle"
+    squareObj = Square()
+    squareObj.draw() # Prints "Draw Square"
+    rectangleObj = Rectangle()
+    rectangleObj.draw() # Prints "Draw Rectangle"
  
 # Here the client code creates the objects but that should not be the case i.e. Client shouldn't  
 # be responsible for creating objects
@@ -94,9 +95,191 @@ class ShapeFactory:
             return Rectangle()
         return None # Else return None
 # Client Code 
-circleObj = ShapeFactory.getShape("Circle") 
-circleObj.draw() # Prints "Draw Circle" 
-squareObj = ShapeFactory.getShape("Square")
-squareObj.draw() # Prints "Draw Square"
-rectangleObj = ShapeFactory.getShape("Rectangle")
-rectangleObj.draw() # Prints "Draw Rectangle"
\ No newline at end of file
+if __name__ == "__main__":
+    circleObj = ShapeFactory.getShape("Circle") 
+    circleObj.draw() # Prints "Draw Circle" 
+    squareObj = ShapeFactory.getShape("Square")
+    squareObj.draw() # Prints "Draw Square"
+    rectangleObj = ShapeFactory.getShape("Rectangle")
+    rectangleObj.draw() # Prints "Draw Rectangle"
+ 
+###################################################################################################################
+ 
+# The problem with the above ShapeFactory is that getShape() walks through the whole if-chain of string
+# comparisons on every call. With 3 shapes this is fine, but if we have hundreds of shapes then every new
+# shape makes every lookup slower, and we also have to edit getShape() each time we add a shape.
+# So instead of the if-chain we keep a registry i.e. a dictionary which maps the type key to the
+# constructor (the class itself), and getShape() becomes a single dictionary lookup.
+ 
+# Registry based Factory
+ 
+import sys, timeit
+ 
+class ShapeFactory:
+    __registry = {} # This is our dispatch table, type key -> constructor of the concrete shape class
+    # register() is used as a decorator on a concrete shape class, or it can be called directly
+    # like ShapeFactory.register("Circle")(Circle). The key is interned using sys.intern(), so if the
+    # client also passes interned keys then the dictionary lookup only compares the string references.
+    @staticmethod
+    def register(type):
+        def decorator(cls):
+            ShapeFactory.__registry[sys.intern(type)] = cls
+            return cls
+        return decorator
+    # Here we declare this method as static, to make it accessible by using ShapeFactory class.
+    # This is one dictionary lookup, no matter how many shapes are registered.
+    @staticmethod
+    def getShape(type = None):
+        constructor = ShapeFactory.__registry.get(type)
+        if constructor is None:
+            return None # If the type is not registered return None, same as our previous ShapeFactory
+        return constructor()
+    # Batch version of getShape(), each distinct key is looked up in the registry only once per batch
+    # and the resolved constructors are reused for the remaining keys of the same type.
+    @staticmethod
+    def getShapes(types):
+        registry = ShapeFactory.__registry
+        resolved = {}
+        shapes = []
+        for type in types:
+            if type not in resolved:
+                resolved[type] = registry.get(type)
+            constructor = resolved[type]
+            shapes.append(constructor() if constructor is not None else None)
+        return shapes
+ 
+# We register our existing concrete shape classes
+ShapeFactory.register("Circle")(Circle)
+ShapeFactory.register("Square")(Square)
+ShapeFactory.register("Rectangle")(Rectangle)
+ 
+# And new shapes can register themselves using the decorator, without touching ShapeFactory at all.
+@ShapeFactory.register("Triangle")
+class Triangle(ShapeInterface):
+    def draw(self):
+        print("Draw Triangle")
+ 
+# Client Code 
+if __name__ == "__main__":
+    circleObj = ShapeFactory.getShape("Circle") 
+    circleObj.draw() # Prints "Draw Circle" 
+    triangleObj = ShapeFactory.getShape("Triangle")
+    triangleObj.draw() # Prints "Draw Triangle"
+    print(ShapeFactory.getShape("Hexagon")) # Prints "None" as "Hexagon" is not registered
+    for shapeObj in ShapeFactory.getShapes(["Square", "Rectangle", "Square"]):
+        shapeObj.draw() # Prints "Draw Square", "Draw Rectangle", "Draw Square"
+ 
+    # Now lets compare the if-chain with the dictionary lookup when 3, 50 and 500 types are registered.
+    # The if-chain is written as a loop over (key, constructor) pairs which does the same string comparisons
+    # one by one, and we always ask for the last registered type which is the worst case for the if-chain.
+ 
+    def ifChainLookup(chain, type):
+        for key, constructor in chain:
+            if type == key:
+                return constructor()
+        return None
+ 
+    for count in (3, 50, 500):
+        chain = [(f"Shape{i}", Circle) for i in range(count)]
+        registry = dict(chain)
+        type = f"Shape{count - 1}"
+        ifChainTime = timeit.timeit(lambda: ifChainLookup(chain, type), number = 10000)
+        registryTime = timeit.timeit(lambda: registry[type](), number = 10000)
+        print(f"{count} types -> if-chain: {ifChainTime:.4f}s, registry: {registryTime:.4f}s")
+ 
+###################################################################################################################
+ 
+# The registry still has a problem: a typo like ShapeFactory.getShape("Circel") silently returns None, which
+# only fails later when we call draw() on it. So here the shape types become typed keys, an IntEnum. The
+# external strings (from a config file, a request ...) are parsed into keys only once, at the boundary of our
+# program, and a wrong string fails right there with a clear error. Inside the program we only pass keys
+# around, and since every key is a small integer the factory is a plain list indexed by the key. This is not
+# faster than the registry: Python caches the hash of a string, so the dictionary lookup is about as cheap as
+# indexing a list, and the keyed factory also has to check that the key is valid.
+ 
+# Key based Factory
+ 
+# The keys are defined once in design_patterns/keys.py and shared with the Abstract Factory example.
+import os
+try:
+    from design_patterns.keys import ShapeType, invalidKey, missingProduct
+except ImportError: # This file is run directly, so the repository root is not on sys.path yet
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    from design_patterns.keys import ShapeType, invalidKey, missingProduct
+ 
+class KeyedShapeFactory:
+    __dispatch = [missingProduct("shape", type) for type in ShapeType] # Dispatch array, index ShapeType -> constructor
+    @staticmethod
+    def register(type):
+        def decorator(cls):
+            KeyedShapeFactory.__dispatch[ShapeType.parse(type)] = cls
+            return cls
+        return decorator
+    # type must be a ShapeType (or its integer value), so use ShapeType.parse() for strings. A value out of range
+    # raises ValueError, as a list would silently accept e.g. -1 and return the last shape, and a string raises
+    # TypeError pointing to ShapeType.parse(). Only a negative key needs its own check, a key which is too big
+    # or not a number already fails when indexing the list, so a valid key pays for one comparison.
+    @staticmethod
+    def getShape(type):
+        try:
+            constructor = KeyedShapeFactory.__dispatch[type] if type >= 0 else None
+        except (IndexError, TypeError):
+            constructor = None
+        if constructor is None:
+            invalidKey(ShapeType, type) # e.g. "-1 is not a valid ShapeType"
+        return constructor()
+    @staticmethod
+    def getShapes(types):
+        dispatch = KeyedShapeFactory.__dispatch
+        shapes = []
+        for type in types:
+            try:
+                constructor = dispatch[type] if type >= 0 else None
+            except (IndexError, TypeError):
+                constructor = None
+            if constructor is None:
+                invalidKey(ShapeType, type)
+            shapes.append(constructor())
+        return shapes
+ 
+KeyedShapeFactory.register(ShapeType.Circle)(Circle)
+KeyedShapeFactory.register(ShapeType.Square)(Square)
+KeyedShapeFactory.register(ShapeType.Rectangle)(Rectangle)
+KeyedShapeFactory.register(ShapeType.Triangle)(Triangle)
+ 
+# Client Code 
+if __name__ == "__main__":
+    circleKey = ShapeType.parse("Circle") # Parsed once, when the string enters our program
+    KeyedShapeFactory.getShape(circleKey).draw() # Prints "Draw Circle"
+    for shapeObj in KeyedShapeFactory.getShapes([ShapeType.Square, ShapeType.Triangle]):
+        shapeObj.draw() # Prints "Draw Square", "Draw Triangle"
+    try:
+        KeyedShapeFactory.getShape(-1)
+    except ValueError as error:
+        print(error) # Prints "-1 is not a valid ShapeType"
+    try:
+        ShapeType.parse("Circel")
+    except ValueError as error:
+        print(error) # Prints "Unknown ShapeType 'Circel', expected one of: Circle, Square, Rectangle, Triangle"
+    try:
+        KeyedShapeFactory.getShape("Circle")
+    except TypeError as error:
+        print(error) # Prints "Expected a ShapeType key, not the string 'Circle', parse it with ShapeType.parse('Circle')"
+ 
+    # Now lets compare the lookups with string keys and with integer keys, first the lookup alone and then
+    # the whole getShape() call of both factories. Both take about the same time, sometimes one is a little
+    # faster and sometimes the other: Python stores the hash inside the string object, so a dictionary lookup
+    # with the same string object is already only a few steps, and creating the shape costs much more than
+    # finding its class. The gain of the keys is that a wrong type fails once, in parse(), with a clear error,
+    # instead of returning None, not speed.
+    names = [type.name for type in ShapeType] * 250
+    keys = list(ShapeType) * 250
+    registry = {type.name: Circle for type in ShapeType}
+    dispatch = [Circle] * len(ShapeType)
+    stringTime = timeit.timeit(lambda: [registry[name] for name in names], number = 1000)
+    integerTime = timeit.timeit(lambda: [dispatch[key] for key in keys], number = 1000)
+    print(f"Lookup -> string keys: {stringTime:.4f}s, integer keys: {integerTime:.4f}s")
+    name, key = "Triangle", ShapeType.Triangle
+    stringTime = timeit.timeit(lambda: ShapeFactory.getShape(name), number = 100000)
+    integerTime = timeit.timeit(lambda: KeyedShapeFactory.getShape(key), number = 100000)
+    print(f"getShape() -> string keys: {stringTime:.4f}s, integer keys: {integerTime:.4f}s")
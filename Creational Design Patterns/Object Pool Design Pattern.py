@@ -0,0 +1,174 @@
+'''
+Object Pool Design Pattern:
+ 
+--- Object Pool is a creational design pattern which keeps a set of already created objects ready
+to use, rather than creating a new object every time one is requested and throwing it away afterwards.
+--- A client acquires an object from the pool, uses it, and releases it back to the pool so that
+the next client can reuse the same object.
+ 
+Problems that arise without Object Pool:
+ 
+--- In our Factory and Abstract Factory examples, ShapeFactory.getShape() and CarTypeFactory.getCarType()
+create a brand new object on every call. If these are called in a hot loop then we keep allocating 
+objects which are used once and then garbage collected, and this allocation and garbage collection
+shows up in the running time.
+--- Products like Circle or VolvoSUV do not even have any state, so every object we create is exactly 
+the same as the previous one.
+ 
+So in the below example, we have an ObjectPool which keeps a bounded free list of objects for one
+concrete class, and a PooledFactory which keeps one ObjectPool per type key. For stateless products
+the PooledFactory can also work in flyweight mode, where all the clients share one single object.
+Objects with state, like a HouseBuilder, are given back in whatever state the last client left them, so
+the pool can call a reset function on every released object before it is reused.
+The pool only stores constructors, so the products still come from the ShapeFactory, CarTypeFactory and
+HouseBuilder of our other examples.
+ 
+'''
+ 
+import threading
+from collections import deque
+from contextlib import contextmanager
+ 
+# ObjectPool keeps free objects of one concrete class.
+class ObjectPool:
+    def __init__(self, constructor, maxSize = 16, reset = None):
+        self.constructor = constructor # Used to create a new object when the pool is empty
+        self.maxSize = maxSize # Maximum number of free objects the pool will hold on to
+        self.reset = reset # Function called with every released object, to clear the state the client left in it
+        self.__free = deque() # Our free list
+        self.__checkedOut = {} # id -> object, for every object acquired and not yet released
+        # Every pool has its own lock, so threads working with different types never wait for each other.
+        self.__lock = threading.Lock()
+        self.hits = 0 # Number of acquire() calls served from the free list
+        self.misses = 0 # Number of acquire() calls which had to create a new object
+        self.inUse = 0 # Number of objects currently acquired and not yet released
+        self.highWaterMark = 0 # Maximum value of inUse seen so far, useful for sizing the pool
+    # Returns a free object from the pool, or creates a new one if the pool is empty
+    def acquire(self):
+        with self.__lock:
+            obj = self.__free.pop() if self.__free else None
+            if obj is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.__checkedOut[id(obj)] = obj
+            self.inUse += 1
+            if self.inUse > self.highWaterMark:
+                self.highWaterMark = self.inUse
+        if obj is None:
+            # The new object is created outside the lock, so other threads are not blocked by the constructor
+            obj = self.constructor()
+            with self.__lock:
+                self.__checkedOut[id(obj)] = obj
+        return obj
+    # Gives an object back to the pool. If the pool is already full the object is simply dropped.
+    # Releasing an object twice would put it on the free list twice, and two clients would later get the
+    # same object, so an object which is not checked out from this pool raises a ValueError.
+    def release(self, obj):
+        with self.__lock:
+            if self.__checkedOut.pop(id(obj), None) is not obj:
+                raise ValueError(f"{obj!r} is not checked out from this pool, it was already released or never acquired")
+            self.inUse -= 1
+            if self.reset is None:
+                if len(self.__free) < self.maxSize:
+                    self.__free.append(obj)
+                return
+        # The reset function runs outside the lock, same as the constructor. If it raises, the object is dropped.
+        self.reset(obj)
+        with self.__lock:
+            if len(self.__free) < self.maxSize:
+                self.__free.append(obj)
+    # Context manager form, the object is released automatically at the end of the "with" block
+    # even if an exception is raised inside it.
+    @contextmanager
+    def borrowed(self):
+        obj = self.acquire()
+        try:
+            yield obj
+        finally:
+            self.release(obj)
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "inUse": self.inUse,
+                "highWaterMark": self.highWaterMark, "free": len(self.__free)}
+ 
+# PooledFactory keeps one ObjectPool for each registered type key.
+class PooledFactory:
+    def __init__(self, maxSize = 16):
+        self.maxSize = maxSize
+        self.__pools = {} # type key -> ObjectPool
+        self.__shared = {} # type key -> single shared object, for stateless products (flyweight mode)
+    # Registers a constructor under a type key. If stateless is True, all clients get the same
+    # object and nothing needs to be released. reset is passed on to the ObjectPool of this key.
+    def register(self, type, constructor, stateless = False, reset = None):
+        if stateless:
+            self.__shared[type] = constructor()
+        else:
+            self.__pools[type] = ObjectPool(constructor, self.maxSize, reset)
+    def acquire(self, type):
+        shared = self.__shared.get(type)
+        if shared is not None:
+            return shared
+        pool = self.__pools.get(type)
+        return pool.acquire() if pool is not None else None
+    def release(self, type, obj):
+        pool = self.__pools.get(type)
+        if pool is not None:
+            pool.release(obj)
+    @contextmanager
+    def borrowed(self, type):
+        obj = self.acquire(type)
+        try:
+            yield obj
+        finally:
+            self.release(type, obj)
+    def stats(self):
+        return {type: pool.stats() for type, pool in self.__pools.items()}
+ 
+# Client Code 
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    import design_patterns
+ 
+    # The products are created by the factories of our other examples, the pool only decides when
+    factory = PooledFactory(maxSize = 4)
+    factory.register("Circle", lambda: design_patterns.ShapeFactory.getShape("Circle"))
+    factory.register("Square", lambda: design_patterns.ShapeFactory.getShape("Square"))
+    # VolvoSUV has no state, so it is shared
+    factory.register("Volvo", lambda: design_patterns.CarTypeFactory.getCar("SUV", "Volvo"), stateless = True)
+    # A HouseBuilder keeps the values of the last house, so it is reset before the next client gets it
+    factory.register("HouseBuilder", design_patterns.HouseBuilder, reset = lambda builder: builder.__init__())
+ 
+    circleObj = factory.acquire("Circle") # Pool is empty, so a new Circle object is created (miss)
+    circleObj.draw() # Prints "Draw Circle"
+    factory.release("Circle", circleObj) # Circle object goes back to the pool
+    print(factory.acquire("Circle") is circleObj) # Prints True, the same object is reused (hit)
+    factory.release("Circle", circleObj)
+    try:
+        factory.release("Circle", circleObj) # Released a second time
+    except ValueError as error:
+        print(error) # Prints "<design_patterns.factory.Circle object at 0x...> is not checked out from this pool, ..."
+ 
+    with factory.borrowed("Square") as squareObj: # Square object is released at the end of the block
+        squareObj.draw() # Prints "Draw Square"
+ 
+    print(factory.acquire("Volvo") is factory.acquire("Volvo")) # Prints True, flyweight object is shared
+    factory.acquire("Volvo").display() # Prints "This is a Volvo SUV"
+ 
+    with factory.borrowed("HouseBuilder") as builder:
+        house = builder.setStories(2).setDoorType("Double").setRoofType("Flat").build()
+    with factory.borrowed("HouseBuilder") as builder: # The same builder again, but with its values reset
+        print(builder.stories, builder.door_type) # Prints "None None"
+ 
+    # Multiple threads using the same pool
+    def drawShapes():
+        for i in range(1000):
+            with factory.borrowed("Circle"):
+                pass
+ 
+    threads = [threading.Thread(target = drawShapes) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(factory.stats()) # Prints hits, misses and high water mark for each pool
@@ -32,16 +32,20 @@ class Student:
         self.__rollNumber = rollNumber # Private Variable
 
 # Client code 
-obj = Student("John", 24, 1)
-cloneObj = Student()
+if __name__ == "__main__":
+    obj = Student("John", 24, 1)
+    cloneObj = Student()
  
-# Here client is responsible for copying all the attributes of 
-# orignal object to the cloned object, which shouldn't be the case.
-cloneObj.name = obj.name 
-cloneObj.age = obj.age 
-cloneObj.__rollNumber = obj.__rollNumber 
-# The last line will give you an error because you can't access private variables outside the class.
-# You can use setter and getter methods in Student class to set and get the private variables values.
+    # Here client is responsible for copying all the attributes of 
+    # orignal object to the cloned object, which shouldn't be the case.
+    cloneObj.name = obj.name 
+    cloneObj.age = obj.age 
+    try:
+        cloneObj.__rollNumber = obj.__rollNumber 
+    except AttributeError as error:
+        print(error) # Prints "'Student' object has no attribute '__rollNumber'"
+    # The line inside "try" gives an error because you can't access private variables outside the class.
+    # You can use setter and getter methods in Student class to set and get the private variables values.
  
 '''
  
@@ -87,20 +91,442 @@ class Student(Prototype):
         return self.__rollNumber
 
 # Client Code
-obj = Student("John", 23, 1) # Create a Student object.
-print(obj) # Original object
- 
-# Now you can just create a clone by just calling the clone() method using the old object, 
-# which will return a clone Object with all the attributes/field values same as the previous old object.
-clone1 = obj.clone() 
-print(clone1) # Clone object of Original object
-clone2 = obj.clone() # Another clone object of Orignal object
- 
-# We can also intern create clones using our previous clone objects.
-clone3 = clone1.clone() # Clone object of our clone1 object
-print(clone2)
-print(clone3)
- 
-# Even private variables from old to new objects gets copied, you can check the
-# private variables by using the getter method that is present in our Student class
-print(clone3.getRollNumber())
\ No newline at end of file
+if __name__ == "__main__":
+    obj = Student("John", 23, 1) # Create a Student object.
+    print(obj) # Original object
+ 
+    # Now you can just create a clone by just calling the clone() method using the old object, 
+    # which will return a clone Object with all the attributes/field values same as the previous old object.
+    clone1 = obj.clone() 
+    print(clone1) # Clone object of Original object
+    clone2 = obj.clone() # Another clone object of Orignal object
+ 
+    # We can also intern create clones using our previous clone objects.
+    clone3 = clone1.clone() # Clone object of our clone1 object
+    print(clone2)
+    print(clone3)
+ 
+    # Even private variables from old to new objects gets copied, you can check the
+    # private variables by using the getter method that is present in our Student class
+    print(clone3.getRollNumber())
+ 
+###################################################################################################################
+ 
+# Our clone() method above calls Student(self.name, self.age, self.__rollNumber), i.e. it runs __init__
+# again and we have to list every field by hand. For a prototype with dozens of fields this is slow and
+# easy to get wrong, and copy.deepcopy() which copies everything automatically is even slower.
+# So here we move the cloning logic into the Prototype class itself, with three strategies:
+#
+# --- shallowClone(): creates the new object without calling __init__ and copies all the fields
+#     (the "__dict__" and the "__slots__" fields if the class has any) in one go.
+# --- compiledClone(): the first time a class is cloned we generate a small clone function for that
+#     class, which copies each field directly, and reuse that function for all the later clones.
+# --- cowClone(): copy on write. The clone shares the nested lists/dicts/sets with the original object,
+#     and a container is only copied the first time either of them asks to change it using writable().
+#     The names of the shared containers are kept in the objects' __dict__, so a prototype with only
+#     __slots__ has nowhere to keep them, and its slot containers are copied right away instead.
+ 
+# Clone engine using Prototype Design pattern
+ 
+import copy, timeit
+ 
+class Prototype(ABC):
+    __cloners = {} # class -> generated clone function for that class
+    @abstractmethod
+    def clone(self):
+        pass
+    # A private field like "__secret" is stored under its mangled name "_Student__secret" (the name of the class
+    # which declares it, without leading underscores), which is the name getattr() and setattr() need.
+    @staticmethod
+    def mangledName(klass, name):
+        if name.startswith("__") and not name.endswith("__"):
+            return f"_{klass.__name__.lstrip('_')}{name}"
+        return name
+    # Returns all the "__slots__" field names of the class, including the ones of its parent classes
+    @staticmethod
+    def slotNames(cls):
+        names = []
+        for klass in cls.__mro__:
+            slots = klass.__dict__.get("__slots__", ())
+            for name in [slots] if isinstance(slots, str) else slots:
+                name = Prototype.mangledName(klass, name)
+                if name not in ("__dict__", "__weakref__") and name not in names:
+                    names.append(name)
+        return names
+    def shallowClone(self):
+        cls = type(self)
+        obj = cls.__new__(cls) # Creates the object without calling __init__
+        if hasattr(self, "__dict__"):
+            obj.__dict__.update(self.__dict__)
+            Prototype.__copyShared(obj)
+        for name in Prototype.slotNames(cls):
+            if hasattr(self, name):
+                setattr(obj, name, getattr(self, name))
+        return obj
+    def compiledClone(self):
+        cls = type(self)
+        cloner = Prototype.__cloners.get(cls)
+        if cloner is None:
+            cloner = Prototype.__cloners[cls] = Prototype.__compile(cls, self)
+        return cloner(self)
+    # A clone of a copy on write clone shares the same containers, so it needs its own set of shared names.
+    # Otherwise writable() on one clone would remove the name for the other clone too, and that clone would
+    # change the container of the original object.
+    @staticmethod
+    def __copyShared(obj):
+        shared = obj.__dict__.get("_Prototype__shared")
+        if shared is not None:
+            obj.__dict__["_Prototype__shared"] = set(shared)
+    # Generates the source code of a clone function for one class and runs it using exec(). The attributes of
+    # the first object cloned are written out one by one, which is about as fast as calling __init__ (from
+    # Python 3.11 an object whose attributes are set one by one keeps them inline, while obj.__dict__.update()
+    # has to create a real dictionary for every clone). An object with other attributes than the first one
+    # falls back to shallowClone(). The shared container names of copy on write are handled separately, so
+    # objects with and without them use the same function. For a class with "name" and "age" in its __dict__
+    # and a slot "a" the generated function looks like:
+    #     def clone(self):
+    #         fields = self.__dict__
+    #         shared = fields.get("_Prototype__shared")
+    #         if len(fields) != 2 + (shared is not None):
+    #             return fallback(self)
+    #         obj = new(cls)
+    #         try:
+    #             obj.name = fields["name"]
+    #             obj.age = fields["age"]
+    #         except KeyError: # Same number of attributes, but not the same ones
+    #             return fallback(self)
+    #         if shared is not None:
+    #             obj._Prototype__shared = set(shared)
+    #         try:
+    #             obj.a = self.a
+    #         except AttributeError: # The slot is not set, so the clone leaves it unset too
+    #             pass
+    #         return obj
+    @staticmethod
+    def __compile(cls, prototype):
+        hasDict = hasattr(prototype, "__dict__")
+        names = [name for name in prototype.__dict__ if name != "_Prototype__shared"] if hasDict else []
+        if not all(name.isidentifier() for name in names): # Set using setattr() with any string, copy it the slow way
+            return Prototype.shallowClone
+        lines = ["def clone(self):"]
+        if hasDict:
+            lines += [
+                "    fields = self.__dict__",
+                "    shared = fields.get('_Prototype__shared')",
+                f"    if len(fields) != {len(names)} + (shared is not None):",
+                "        return fallback(self)",
+            ]
+        lines.append("    obj = new(cls)")
+        if names:
+            lines.append("    try:")
+            lines.extend(f"        obj.{name} = fields[{name!r}]" for name in names)
+            lines += ["    except KeyError:", "        return fallback(self)"]
+        if hasDict:
+            lines += ["    if shared is not None:", "        obj._Prototype__shared = set(shared)"]
+        for name in Prototype.slotNames(cls):
+            lines.extend(["    try:", f"        obj.{name} = self.{name}", "    except AttributeError:", "        pass"])
+        lines.append("    return obj")
+        namespace = {"new": cls.__new__, "cls": cls, "fallback": Prototype.shallowClone}
+        exec("\n".join(lines), namespace)
+        return namespace["clone"]
+    # The clone shares its containers with the original object, so both of them record these containers as shared,
+    # and writable() copies a container on whichever side changes it first.
+    def cowClone(self):
+        obj = self.compiledClone()
+        containers = [name for name in Prototype.slotNames(type(self)) if isinstance(getattr(self, name, None), (list, dict, set))]
+        if hasattr(obj, "__dict__"):
+            # Names of the container fields which are still shared with the original object
+            containers.extend(name for name, value in self.__dict__.items() if name != "_Prototype__shared" and isinstance(value, (list, dict, set)))
+            obj.__dict__["_Prototype__shared"] = set(containers)
+            self.__dict__.setdefault("_Prototype__shared", set()).update(containers)
+        else:
+            for name in containers: # No __dict__ to keep the shared names in, so copy the containers now
+                setattr(obj, name, copy.copy(getattr(self, name)))
+        return obj
+    # Returns a container field of a copy on write clone which is safe to change.
+    # The container gets copied the first time this is called for that field.
+    def writable(self, name):
+        shared = self.__dict__.get("_Prototype__shared", ()) if hasattr(self, "__dict__") else ()
+        if name in shared:
+            shared.discard(name)
+            setattr(self, name, copy.copy(getattr(self, name)))
+        return getattr(self, name)
+    # Creates n clones of this object in one call
+    def clone_many(self, n):
+        cls = type(self)
+        cloner = Prototype.__cloners.get(cls)
+        if cloner is None:
+            cloner = Prototype.__cloners[cls] = Prototype.__compile(cls, self)
+        return [cloner(self) for i in range(n)]
+ 
+# Original Object class
+class Student(Prototype):
+    def __init__(self, name = None, age = None, rollNumber = None, subjects = None):
+        self.name = name 
+        self.age = age 
+        self.__rollNumber = rollNumber # Private Variable
+        self.subjects = subjects if subjects is not None else [] # Nested container
+    # Our __init__ only stores its arguments, so it is still the fastest way to clone a Student, and the other
+    # strategies stay available as shallowClone(), compiledClone() and cowClone(). Like them, the clone shares
+    # the subjects list with the original object.
+    def clone(self):
+        return type(self)(self.name, self.age, self.__rollNumber, self.subjects)
+    def getRollNumber(self):
+        return self.__rollNumber
+ 
+# Client Code
+if __name__ == "__main__":
+    obj = Student("John", 23, 1, ["Maths", "Physics"])
+    clone1 = obj.clone()
+    print(clone1.getRollNumber()) # Prints "1", private variables get copied too
+    clone2 = obj.cowClone()
+    print(clone2.subjects is obj.subjects) # Prints True, the subjects list is shared until we change it
+    clone2.writable("subjects").append("Chemistry")
+    print(obj.subjects, clone2.subjects) # Prints "['Maths', 'Physics'] ['Maths', 'Physics', 'Chemistry']"
+    print(len(obj.clone_many(5))) # Prints "5"
+ 
+    # Now lets compare the time taken for 100000 clones using each strategy
+    # Our Student has only four fields, so calling __init__ is still cheap here and compiledClone() is about
+    # as fast. The compiled clone function pays off when __init__ does more work than storing its arguments.
+    for name, cloneFunction in (
+        ("clone() calling __init__", obj.clone),
+        ("copy.copy()", lambda: copy.copy(obj)),
+        ("copy.deepcopy()", lambda: copy.deepcopy(obj)),
+        ("shallowClone()", obj.shallowClone),
+        ("compiledClone()", obj.compiledClone),
+        ("cowClone()", obj.cowClone),
+    ):
+        print(f"{name}: {timeit.timeit(cloneFunction, number = 100000):.3f}s")
+    print(f"clone_many(100000): {timeit.timeit(lambda: obj.clone_many(100000), number = 1):.3f}s")
+ 
+###################################################################################################################
+ 
+# Now that cloning is fast, we usually keep a few objects as templates and clone them whenever we need
+# a new object. But if every part of the client code holds its own template, the templates slowly become
+# different from each other. So we keep all the canonical prototypes in one place, a PrototypeRegistry,
+# and clients ask the registry for a clone by name and version.
+# --- The registry holds at most maxSize prototypes, and when it is full the least recently used one is evicted
+#     (approximately, using the same second chance eviction as the HouseCache of our Builder example). With a
+#     maxSize of 0 nothing is kept, and every get() asks the loader.
+# --- If a prototype is not in the registry, it is loaded using the loader function given to the registry.
+# --- Reading a prototype does not take any lock, only adding or evicting prototypes does.
+ 
+# Prototype Registry
+ 
+import threading
+from collections import OrderedDict
+ 
+class PrototypeRegistry:
+    def __init__(self, maxSize = 128, loader = None):
+        self.maxSize = maxSize
+        self.loader = loader # Function (name, version) -> prototype, called when a prototype is missing
+        self.__prototypes = OrderedDict() # (name, version) -> [prototype, used since the last eviction scan], oldest first
+        self.__lock = threading.Lock() # Only used while adding or evicting prototypes
+        self.hits = 0 # Updated without the lock, so it can be slightly off when many threads read at once
+        self.misses = 0
+        self.evictions = 0
+    def register(self, name, prototype, version = 1):
+        with self.__lock:
+            self.__add((name, version), prototype)
+    # Must be called with the lock held. A new prototype goes to the end of the order, which already protects it
+    # from the next evictions, so it starts as not used.
+    def __add(self, key, prototype):
+        self.__prototypes.pop(key, None)
+        self.__prototypes[key] = [prototype, False]
+        while len(self.__prototypes) > max(self.maxSize, 0):
+            self.__evict()
+    # Second chance eviction, must be called with the lock held. The oldest prototype is evicted if it was not
+    # used since the last scan, otherwise it is marked as unused and moved to the end, and we look at the next one.
+    def __evict(self):
+        while True:
+            key, entry = self.__prototypes.popitem(last = False)
+            if not entry[1]:
+                self.evictions += 1
+                return
+            entry[1] = False
+            self.__prototypes[key] = entry
+    # Returns a clone of the prototype registered under name and version.
+    # Raises a KeyError if there is no such prototype and the loader cannot provide it.
+    def get(self, name, version = 1):
+        key = (name, version)
+        entry = self.__prototypes.get(key) # A single dictionary read, safe without the lock
+        if entry is not None:
+            self.hits += 1
+            entry[1] = True # Marks it as used, instead of moving it to the end of the order which needs the lock
+            return entry[0].clone()
+        with self.__lock:
+            entry = self.__prototypes.get(key) # Another thread may have loaded it while we waited
+            if entry is None:
+                self.misses += 1
+                prototype = self.loader(name, version) if self.loader is not None else None
+                if prototype is None:
+                    raise KeyError(f"No prototype registered for {name!r} version {version}")
+                self.__add(key, prototype) # With maxSize 0 it is evicted right away, so we clone our own reference
+                return prototype.clone()
+        return entry[0].clone()
+    def invalidate(self, name, version = 1):
+        with self.__lock:
+            self.__prototypes.pop((name, version), None)
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self.__prototypes)}
+ 
+# Client Code
+def loadStudent(name, version): # In a real application this could read the template from a file or a database
+    return Student(name, 20 + version, version)
+ 
+if __name__ == "__main__":
+    registry = PrototypeRegistry(maxSize = 2, loader = loadStudent)
+    registry.register("John", Student("John", 23, 1, ["Maths"]))
+    student1 = registry.get("John") # Hit, returns a clone of the registered John prototype
+    print(student1.name, student1.getRollNumber()) # Prints "John 1"
+    student2 = registry.get("Alice", 2) # Miss, the loader creates the Alice prototype and the registry keeps it
+    print(student2.name, student2.age) # Prints "Alice 22"
+    registry.get("John") # John is now the most recently used prototype
+    registry.get("Bob") # Registry is full, so Alice (least recently used) is evicted to make room for Bob
+    print(registry.stats()) # Prints "{'hits': 2, 'misses': 2, 'evictions': 1, 'size': 2}"
+ 
+###################################################################################################################
+ 
+# To send clones to other processes we usually pickle each clone and unpickle it on the other side.
+# pickle has to write the class name, every field name and every value with its type for each object,
+# and when we send millions of clones this work dominates the time.
+# Instead, a class can declare a fixed schema, i.e. the list of its fields and the binary format of each
+# field. Then every object of that class becomes a fixed size record of bytes, which we write once into
+# shared memory, and any process can create clones directly from these bytes. It can either read the whole
+# record at once, or wrap it in a lazy view which only decodes a field when that field is accessed.
+ 
+# Binary snapshots of Prototypes
+ 
+import pickle, struct
+from multiprocessing import shared_memory
+ 
+class PrototypeSnapshot:
+    # fields is a list of (field name, struct format) pairs, for example [("name", "32s"), ("age", "i")].
+    # Private fields are written with their double underscore name like "__rollNumber", and we convert
+    # them to the name Python really stores them under, i.e. "_Student__rollNumber".
+    # Fields which have no fixed size, like a list, cannot be in the record, so read() sets them using
+    # defaults, a dictionary field name -> function which returns a new value, e.g. {"subjects": list}.
+    def __init__(self, cls, fields, defaults = None):
+        self.cls = cls
+        self.names = [PrototypeSnapshot.__storedName(cls, name) for name, fmt in fields]
+        self.formats = [fmt for name, fmt in fields]
+        self.defaults = [(PrototypeSnapshot.__storedName(cls, name), factory) for name, factory in (defaults or {}).items()]
+        self.struct = struct.Struct("<" + "".join(self.formats)) # "<" means no padding between the fields
+        self.size = self.struct.size # Size of one record in bytes
+        # field name as written in the schema -> (position of the field inside the record, its format)
+        self.fields = {}
+        for index, (name, fmt) in enumerate(fields):
+            self.fields[name] = (struct.calcsize("<" + "".join(self.formats[:index])), struct.Struct("<" + fmt))
+        self.__checkComplete()
+    # A private field belongs to the class which declares it, so for a subclass of Student "__rollNumber" is still
+    # "_Student__rollNumber". The declaring class is the one in the MRO whose slots or methods use the mangled name.
+    @staticmethod
+    def __storedName(cls, name):
+        for klass in cls.__mro__:
+            storedName = Prototype.mangledName(klass, name)
+            if storedName == name:
+                return name
+            if storedName in Prototype.slotNames(klass):
+                return storedName
+            for attribute in vars(klass).values():
+                if storedName in getattr(getattr(attribute, "__code__", None), "co_names", ()):
+                    return storedName
+        return Prototype.mangledName(cls, name)
+    # A clone read from a snapshot must have every field an object created by __init__ has, otherwise e.g. a
+    # Student without its subjects list would only fail later. If the class can be created without arguments
+    # we compare with such an object, and reject a schema which neither stores nor has a default for a field.
+    def __checkComplete(self):
+        try:
+            sample = self.cls()
+        except TypeError: # __init__ needs arguments, so we cannot know the fields in advance
+            return
+        names = list(vars(sample)) if hasattr(sample, "__dict__") else []
+        names.extend(name for name in Prototype.slotNames(self.cls) if hasattr(sample, name))
+        known = set(self.names) | {name for name, factory in self.defaults}
+        missing = [name for name in names if name not in known and name != "_Prototype__shared"]
+        if missing:
+            raise ValueError(f"{self.cls.__name__} fields {missing} are neither in the snapshot schema nor in its defaults")
+    # Strings are stored as fixed size utf-8 bytes, so we encode them while writing and decode them while reading.
+    # struct would silently cut a longer string (maybe in the middle of a character, so read() could not decode
+    # it anymore) and fails with a bare struct.error for None, so we check both here and name the field.
+    def __encode(self, name, value, fmt):
+        if value is None:
+            raise ValueError(f"{self.cls.__name__}.{name} is None or not set, a snapshot needs a value for every field")
+        if not fmt.endswith("s"):
+            return value
+        encoded = value.encode("utf-8")
+        if len(encoded) > struct.calcsize(fmt):
+            raise ValueError(f"{self.cls.__name__}.{name} is {len(encoded)} bytes in utf-8, the schema only allows {struct.calcsize(fmt)} ({fmt!r})")
+        return encoded
+    def __decode(self, value, fmt):
+        return value.rstrip(b"\0").decode("utf-8") if fmt.endswith("s") else value
+    # Writes obj as one record into buffer (bytearray, memoryview, shared memory or mmap) at offset
+    def write(self, obj, buffer, offset = 0):
+        values = [self.__encode(name, getattr(obj, name, None), fmt) for name, fmt in zip(self.names, self.formats)]
+        try:
+            self.struct.pack_into(buffer, offset, *values)
+        except struct.error as error: # e.g. a string given for an "i" field, or a number out of range
+            raise ValueError(f"cannot write {self.cls.__name__} with schema {self.struct.format!r}: {error}") from None
+    # Creates a new object from the record at offset, without calling __init__. setattr() works for __slots__
+    # fields as well as for __dict__ fields.
+    def read(self, buffer, offset = 0):
+        obj = self.cls.__new__(self.cls)
+        values = self.struct.unpack_from(buffer, offset)
+        for name, value, fmt in zip(self.names, values, self.formats):
+            setattr(obj, name, self.__decode(value, fmt))
+        for name, factory in self.defaults:
+            setattr(obj, name, factory())
+        return obj
+    # Returns a lazy view of the record at offset, no bytes are copied or decoded until a field is read
+    def view(self, buffer, offset = 0):
+        return SnapshotView(self, buffer, offset)
+ 
+class SnapshotView:
+    def __init__(self, snapshot, buffer, offset):
+        self.__snapshot = snapshot
+        self.__buffer = buffer
+        self.__offset = offset
+    def __getattr__(self, name):
+        field = self.__snapshot.fields.get(name)
+        if field is None:
+            raise AttributeError(name)
+        # Decode only this field, starting at its position inside the record
+        fieldOffset, fieldStruct = field
+        value = fieldStruct.unpack_from(self.__buffer, self.__offset + fieldOffset)[0]
+        return value.rstrip(b"\0").decode("utf-8") if isinstance(value, bytes) else value
+ 
+# Schema of our Student class, the subjects list has no fixed size so it is not part of the record, and every
+# clone read from the snapshot gets a new empty list
+StudentSnapshot = PrototypeSnapshot(Student, [("name", "32s"), ("age", "i"), ("__rollNumber", "i")], {"subjects": list})
+ 
+# Client Code
+if __name__ == "__main__":
+    prototype = Student("John", 23, 7)
+    memory = shared_memory.SharedMemory(create = True, size = StudentSnapshot.size)
+    StudentSnapshot.write(prototype, memory.buf) # The prototype is written only once
+ 
+    # A worker process would attach to the same shared memory using its name
+    workerMemory = shared_memory.SharedMemory(name = memory.name)
+    clone1 = StudentSnapshot.read(workerMemory.buf)
+    print(clone1.name, clone1.age, clone1.getRollNumber(), clone1.subjects) # Prints "John 23 7 []"
+    lazyClone = StudentSnapshot.view(workerMemory.buf)
+    print(lazyClone.age, lazyClone.__rollNumber) # Prints "23 7", only these two fields are decoded
+    try:
+        StudentSnapshot.write(Student("Bob"), bytearray(StudentSnapshot.size))
+    except ValueError as error:
+        print(error) # Prints "Student.age is None or not set, a snapshot needs a value for every field"
+    try:
+        PrototypeSnapshot(Student, [("name", "32s"), ("age", "i"), ("__rollNumber", "i")])
+    except ValueError as error:
+        print(error) # Prints "Student fields ['subjects'] are neither in the snapshot schema nor in its defaults"
+ 
+    # Now lets compare creating 100000 clones from the snapshot with pickling and unpickling every clone
+    count = 100000
+    pickled = timeit.timeit(lambda: pickle.loads(pickle.dumps(prototype, protocol = 5)), number = count)
+    fromSnapshot = timeit.timeit(lambda: StudentSnapshot.read(workerMemory.buf), number = count)
+    print(f"pickle protocol 5: {pickled:.3f}s, snapshot: {fromSnapshot:.3f}s")
+ 
+    del clone1, lazyClone # Release our references to the buffer before closing the shared memory
+    workerMemory.close()
+    memory.close()
+    memory.unlink() # Free the shared memory once no process needs it anymore
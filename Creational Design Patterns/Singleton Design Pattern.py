@@ -25,15 +25,17 @@ class Singleton:
             Singleton.__instance = self # Whenver a Singleton object gets created
  
 # Client code 
-obj1 = Singleton.getInstance() # As there is no instance created on this class 
-obj2 = Singleton.getInstance() # This will return the same instance that is already created
+if __name__ == "__main__":
+    obj1 = Singleton.getInstance() # As there is no instance created on this class 
+    obj2 = Singleton.getInstance() # This will return the same instance that is already created
  
-# But most programmers create objects/instances in the below format rather than calling getInstance() static method.
-# But as we are using __init__ constructor in python unlike Java, if the instance is already created
-# it will raise an Exception as we have written above.
+    # But most programmers create objects/instances in the below format rather than calling getInstance() static method.
+    # But as we are using __init__ constructor in python unlike Java, if the instance is already created
+    # it will raise an Exception as we have written above.
  
-obj3 = Singleton()
-print(obj3)
+    obj3 = Singleton()
+    print(obj3)
+InitSingleton = Singleton # We keep a reference to each variant, to compare all of them at the end
  
   
 ##########################################################################################################################################
@@ -63,16 +65,18 @@ class Singleton:
         return cls.__instance
  
 # Client code 
-obj1 = Singleton.getInstance() # As there is no instance created on this class 
-obj2 = Singleton.getInstance() # This will give the same instance that is already created
-obj3 = Singleton() # This will also give the same instance that is created unlike our previous code
-obj4 = Singleton() # This will also give the same instance that is created unlike our previous code
-print(obj1)
-print(obj2)
-print(obj3)
-print(obj4)
-obj1.x = 10 # 
-print(obj4.x) # It will print 10 as all the objects point to same single instance of our class
+if __name__ == "__main__":
+    obj1 = Singleton.getInstance() # As there is no instance created on this class 
+    obj2 = Singleton.getInstance() # This will give the same instance that is already created
+    obj3 = Singleton() # This will also give the same instance that is created unlike our previous code
+    obj4 = Singleton() # This will also give the same instance that is created unlike our previous code
+    print(obj1)
+    print(obj2)
+    print(obj3)
+    print(obj4)
+    obj1.x = 10 # 
+    print(obj4.x) # It will print 10 as all the objects point to same single instance of our class
+NewSingleton = Singleton # Keep this variant for the comparison at the end
  
 #######################################################################################################################################
  
@@ -98,10 +102,12 @@ class Singleton:
                 cls.__instance = super(Singleton, cls).__new__(cls)
             return cls.__instance
  
-s1 = Singleton()
-s2 = Singleton()
-print(s1)
-print(s2)
+if __name__ == "__main__":
+    s1 = Singleton()
+    s2 = Singleton()
+    print(s1)
+    print(s2)
+ThreadSafeSingleton = Singleton # Keep this variant for the comparison at the end
  
 ##################################################################################################################
  
@@ -128,7 +134,317 @@ class Singleton:
         
         return cls.__instance
  
-s1 = Singleton()
-s2 = Singleton()
-print(s1)
-print(s2)
+if __name__ == "__main__":
+    s1 = Singleton()
+    s2 = Singleton()
+    print(s1)
+    print(s2)
+DoubleLockingSingleton = Singleton # Keep this variant for the comparison at the end
+
+ 
+##################################################################################################################
+ 
+# In the Double Locking code, every Singleton() call after the first one still does an "== None" check,
+# and the Thread-Safe code takes the lock on every call. Also every singleton class has to write its own
+# __instance, __lock and __new__ again and again.
+# So we move this logic into a metaclass. A metaclass is the class of a class, and its __call__ method runs
+# whenever we write Singleton(). SingletonMeta keeps one registry (dictionary) of instances for all the
+# singleton classes. Once the instance is created, Singleton() is one dictionary lookup without any lock,
+# which is about as fast as the "== None" check of Double Locking; what we gain is that no class has to repeat
+# that code. Each class has its own lock, taken only the first time, when its instance does not exist yet.
+# So a singleton whose __init__ creates another singleton (e.g. a Config which creates the Logger) does not
+# wait on a lock held by itself.
+# Reading and writing a dictionary is thread-safe in CPython even without the GIL (free-threaded builds),
+# so the fast path stays correct there too.
+ 
+# Singleton using Metaclass
+ 
+import threading, time
+ 
+class SingletonMeta(type):
+    __instances = {} # class -> its single instance, shared by all classes using this metaclass
+    __locks = {} # class -> lock taken while its instance is created
+    __locksLock = threading.Lock() # Only guards the creation of the per class locks
+    def __call__(cls, *args, **kwargs):
+        try:
+            return SingletonMeta.__instances[cls] # Fast path, the instance is already created
+        except KeyError:
+            pass
+        with SingletonMeta.__locksLock:
+            lock = SingletonMeta.__locks.setdefault(cls, threading.Lock())
+        with lock: # Slow path, only until the instance is created
+            if cls not in SingletonMeta.__instances:
+                SingletonMeta.__instances[cls] = super().__call__(*args, **kwargs)
+        return SingletonMeta.__instances[cls]
+    # Same getInstance() as our first Singleton, available on every class using this metaclass
+    def getInstance(cls):
+        return cls()
+ 
+# Now any class becomes a Singleton just by using SingletonMeta as its metaclass
+class Singleton(metaclass = SingletonMeta):
+    pass
+ 
+class Logger(metaclass = SingletonMeta):
+    pass
+ 
+if __name__ == "__main__":
+    s1 = Singleton()
+    s2 = Singleton.getInstance()
+    print(s1 is s2) # Prints True
+    print(Logger() is Logger()) # Prints True
+    print(Logger() is s1) # Prints False, every class has its own single instance
+    class Config(metaclass = SingletonMeta):
+        def __init__(self):
+            self.logger = Logger() # Another singleton created while Config is being created
+    print(Config().logger is Logger()) # Prints True
+ 
+    # Now lets compare all the variants when 64 threads create the Singleton object at the same time.
+    # Our first variant prints a message from __init__ every time Singleton() is called, so we use getInstance() for it.
+    def compare(name, createSingleton, threadCount = 64, calls = 10000):
+        def worker():
+            for i in range(calls):
+                createSingleton()
+        threads = [threading.Thread(target = worker) for i in range(threadCount)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        print(f"{name}: {time.perf_counter() - start:.3f}s")
+ 
+    # getInstance() of our first variant looks up the global name "Singleton", so we point that name back to
+    # the first variant while it is being compared.
+    MetaSingleton, Singleton = Singleton, InitSingleton
+    compare("Lazy Evaluation with __init__", InitSingleton.getInstance)
+    Singleton = MetaSingleton
+    compare("Lazy Evaluation with __new__", NewSingleton)
+    compare("Thread-Safe", ThreadSafeSingleton)
+    compare("Double-Locking", DoubleLockingSingleton)
+    compare("Metaclass", Singleton)
+ 
+##################################################################################################################
+ 
+# All our Singleton variants create the instance inside __new__ (or __call__) on the first access. If the
+# singleton wraps something expensive, like loading a config file or opening a connection pool, then the
+# first request in each process pays the whole cost while holding the lock, and every other thread waits.
+# So here we have a LazySingleton which:
+# --- can be warmed up at startup, i.e. all the expensive singletons are created in the background using
+#     a thread pool before the first request comes in.
+# --- has getInstanceAsync() for asyncio code, which waits for the construction without blocking the event loop.
+# --- is reset in a child process after os.fork(), so the child creates its own instance (a connection
+#     opened by the parent process should not be shared with the child process).
+# --- records how long the construction of each singleton took.
+ 
+# Lazy Singleton with warm-up
+ 
+import asyncio, os, weakref
+from concurrent.futures import ThreadPoolExecutor
+ 
+class LazySingleton:
+    # Every LazySingleton still in use, used for warm-up, reset and the report. The references are weak, so a
+    # LazySingleton nobody uses anymore (like the short lived ones of our benchmark below) is dropped from it.
+    __singletons = weakref.WeakSet()
+    def __init__(self, name, factory):
+        self.name = name 
+        self.factory = factory # Function which creates the instance, called only once
+        self.constructionTime = None # Seconds taken by factory(), None until the instance is created
+        self.__instance = None 
+        # Each singleton has its own lock, so a slow factory only blocks the threads waiting for this singleton
+        self.__lock = threading.Lock() 
+        LazySingleton.__singletons.add(self)
+    def getInstance(self):
+        if self.__instance is None:
+            with self.__lock: 
+                if self.__instance is None:
+                    start = time.perf_counter()
+                    self.__instance = self.factory()
+                    self.constructionTime = time.perf_counter() - start
+        return self.__instance
+    # For asyncio code, the factory runs in a thread of the default executor so the event loop keeps
+    # running other tasks while the instance is being created.
+    async def getInstanceAsync(self):
+        if self.__instance is not None:
+            return self.__instance
+        return await asyncio.get_running_loop().run_in_executor(None, self.getInstance)
+    # Forgets the instance, so the next getInstance() creates a new one
+    def reset(self):
+        self.__instance = None 
+        self.__lock = threading.Lock() # The lock could have been held by another thread of the parent process
+        self.constructionTime = None 
+    # Creates the given singletons (or all of them if None) in the background, returns the thread pool futures
+    @staticmethod
+    def warmUp(singletons = None, maxWorkers = 4):
+        if singletons is None:
+            singletons = list(LazySingleton.__singletons) # A copy, another thread may create a LazySingleton meanwhile
+        pool = ThreadPoolExecutor(max_workers = maxWorkers, thread_name_prefix = "warm-up")
+        futures = [pool.submit(singleton.getInstance) for singleton in singletons]
+        pool.shutdown(wait = False) # The pool finishes the submitted work and then stops its threads
+        return futures
+    @staticmethod
+    def resetAll():
+        for singleton in list(LazySingleton.__singletons):
+            singleton.reset()
+    # Returns the construction time of every singleton which has been created
+    @staticmethod
+    def report():
+        return {singleton.name: singleton.constructionTime for singleton in list(LazySingleton.__singletons) if singleton.constructionTime is not None}
+ 
+# After os.fork() the child process starts with fresh singletons (os.register_at_fork is not available on Windows)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child = LazySingleton.resetAll)
+ 
+# Client code 
+def loadConfig(): # Expensive construction, for example reading and parsing a config file
+    time.sleep(0.2)
+    return {"debug": False}
+def createConnectionPool(): # Another expensive construction
+    time.sleep(0.3)
+    return ["connection1", "connection2"]
+ 
+if __name__ == "__main__":
+    config = LazySingleton("config", loadConfig)
+    connectionPool = LazySingleton("connectionPool", createConnectionPool)
+ 
+    start = time.perf_counter()
+    for future in LazySingleton.warmUp(): # At startup, both are created in parallel in the background
+        future.result() # Here we wait only to show the timing, a service would continue with its startup
+    print(f"Warm-up took {time.perf_counter() - start:.1f}s") # Prints about 0.3s, not 0.5s
+    print(config.getInstance() is config.getInstance()) # Prints True
+    print(LazySingleton.report()) # Prints the construction time of config and connectionPool
+ 
+    async def handleRequest():
+        pool = await connectionPool.getInstanceAsync() # Does not block the event loop
+        return pool[0]
+    print(asyncio.run(handleRequest())) # Prints "connection1"
+ 
+##################################################################################################################
+ 
+# A Singleton gives one instance to the whole process, so if the instance has state which threads change,
+# every thread has to take the same lock before changing it, and our threads end up running one at a time.
+# Often we do not really need one instance per process, we need one instance per thread (or per asyncio
+# task), so that no two threads ever touch the same instance. So here we have scoped singletons, all of
+# them with the same getInstance() method as our LazySingleton:
+# --- ThreadScopedSingleton: one instance per thread, stored in threading.local().
+# --- ProcessScopedSingleton: one instance per process. It remembers the process id which created the
+#     instance, so after os.fork() the child process sees a different id and creates its own instance. Its lock
+#     could have been held by another thread of the parent at the time of the fork, so the child replaces it.
+# --- ContextScopedSingleton: one instance per asyncio task (and per thread outside of asyncio). Every task
+#     runs in its own copy of the context, but that copy starts with the values of the parent, so if the
+#     parent already created the instance, a plain ContextVar would hand that same instance to every child
+#     task. So the stored instances remember the task which created them, and a child task creates its own.
+ 
+# Scoped Singletons
+ 
+import contextvars
+ 
+class ThreadScopedSingleton:
+    def __init__(self, factory):
+        self.factory = factory 
+        self.__local = threading.local() # Every thread sees its own attributes on this object
+    def getInstance(self):
+        instance = getattr(self.__local, "instance", None)
+        if instance is None:
+            instance = self.__local.instance = self.factory()
+        return instance
+ 
+class ProcessScopedSingleton:
+    __singletons = weakref.WeakSet() # Every ProcessScopedSingleton still in use, so their locks can be replaced after a fork
+    def __init__(self, factory):
+        self.factory = factory 
+        self.__pid = None # Process id of the process which created the instance
+        self.__instance = None 
+        self.__lock = threading.Lock() 
+        ProcessScopedSingleton.__singletons.add(self)
+    def getInstance(self):
+        if self.__pid != os.getpid():
+            with self.__lock: 
+                if self.__pid != os.getpid():
+                    self.__instance = self.factory()
+                    self.__pid = os.getpid()
+        return self.__instance
+    # Only the thread which called os.fork() exists in the child, so a lock held by any other thread of the parent
+    # would never be released there. The instance is not touched, the child creates its own as its pid differs.
+    @staticmethod
+    def resetLocks():
+        for singleton in list(ProcessScopedSingleton.__singletons):
+            singleton.__lock = threading.Lock()
+ 
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child = ProcessScopedSingleton.resetLocks)
+ 
+class ContextScopedSingleton:
+    # One ContextVar for all the context scoped singletons, created once at module level as the contextvars docs
+    # advise (ContextVars are never freed). Its value is (owner task, {singleton -> instance}).
+    __scope = contextvars.ContextVar("ContextScopedSingleton")
+    def __init__(self, factory):
+        self.factory = factory 
+    def getInstance(self):
+        try:
+            owner = asyncio.current_task()
+        except RuntimeError: # No running event loop, i.e. we are not inside asyncio
+            owner = None
+        scope = ContextScopedSingleton.__scope.get(None)
+        if scope is None or scope[0] is not owner: # Nothing created yet, or only by the parent task
+            scope = (owner, {})
+            ContextScopedSingleton.__scope.set(scope)
+        instance = scope[1].get(self)
+        if instance is None:
+            instance = scope[1][self] = self.factory()
+        return instance
+ 
+# Client code 
+class Counter: # Our stateful object, which gets changed a lot
+    def __init__(self):
+        self.count = 0
+ 
+if __name__ == "__main__":
+    perThread = ThreadScopedSingleton(Counter)
+    result = []
+    t = threading.Thread(target = lambda: result.append(perThread.getInstance()))
+    t.start()
+    t.join()
+    print(perThread.getInstance() is perThread.getInstance()) # Prints True, same instance within a thread
+    print(perThread.getInstance() is result[0]) # Prints False, the other thread got its own instance
+ 
+    perContext = ContextScopedSingleton(Counter)
+    async def task():
+        return perContext.getInstance()
+    async def main():
+        parent = perContext.getInstance() # The child tasks copy this context, but still get their own instances
+        return parent, *await asyncio.gather(task(), task())
+    parent, first, second = asyncio.run(main())
+    print(first is second, first is parent) # Prints "False False", each asyncio task got its own instance
+ 
+    # Now lets compare a workload which changes the counter from 1, 8 and 32 threads. With one instance per
+    # process the threads must take a lock around each change, with the scoped singletons they do not.
+    sharedLock = threading.Lock()
+    def increment(singleton, locked):
+        counter = singleton.getInstance()
+        if locked:
+            with sharedLock:
+                counter.count += 1
+        else:
+            counter.count += 1
+ 
+    def runWorkload(singleton, locked, threadCount, calls = 20000):
+        def worker():
+            for i in range(calls // threadCount):
+                increment(singleton, locked)
+        threads = [threading.Thread(target = worker) for i in range(threadCount)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return time.perf_counter() - start
+ 
+    for threadCount in (1, 8, 32):
+        timings = [
+            ("global + lock", runWorkload(LazySingleton("counter", Counter), True, threadCount)),
+            ("thread", runWorkload(ThreadScopedSingleton(Counter), False, threadCount)),
+            ("process + lock", runWorkload(ProcessScopedSingleton(Counter), True, threadCount)),
+            ("context", runWorkload(ContextScopedSingleton(Counter), False, threadCount)),
+        ]
+        print(f"{threadCount} threads -> " + ", ".join(f"{name}: {elapsed:.3f}s" for name, elapsed in timings))
+    print(sorted(LazySingleton.report())) # Prints "['config', 'connectionPool']", the "counter" singletons above are already gone
+    print(LazySingleton.warmUp([])) # Prints "[]", an empty list warms up nothing
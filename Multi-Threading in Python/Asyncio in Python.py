@@ -0,0 +1,144 @@
+'''
+Asyncio in Python:
+ 
+In our Multi-threading examples Hello() and Hi() spend almost all their time in time.sleep(1), i.e. waiting.
+Every one of these waits holds a whole OS thread, with its own stack, so if we need tens of thousands of
+waits at the same time we need tens of thousands of threads.
+ 
+asyncio runs all the tasks in one thread. A coroutine (a function defined with "async def") gives control
+back to the event loop whenever it "await"s something like asyncio.sleep(), and the event loop runs another
+task in the meantime. A waiting task is just a small Python object, so we can have many thousands of them.
+ 
+Below we have:
+--- Hello() and Hi() as coroutines.
+--- TaskRunner: runs a group of tasks together, waits for all of them, and if one of them fails the others
+    are cancelled (structured concurrency).
+--- AsyncTimedLock and AsyncTimedSemaphore: same acquire()/release()/hold()/"with" style as our TimedLock
+    from the Locks example, but for asyncio ("async with").
+--- runBlocking(): runs a normal blocking function in a thread of the executor, so it does not block the event loop.
+ 
+'''
+ 
+import asyncio, threading, time, tracemalloc
+from contextlib import asynccontextmanager
+ 
+async def Hello(name):
+    for i in range(3):
+        print(f'{name} is printing Hello')
+        await asyncio.sleep(0.1) # Gives control back to the event loop while waiting
+ 
+async def Hi(name):
+    for i in range(3):
+        print(f'{name} is printing Hi')
+        await asyncio.sleep(0.1)
+ 
+class TaskRunner:
+    def __init__(self):
+        self.__tasks = []
+    def start(self, coroutine, name = None):
+        task = asyncio.create_task(coroutine, name = name)
+        self.__tasks.append(task)
+        return task
+    async def __aenter__(self):
+        return self
+    # Waits for all the tasks. If any task raises an exception, the remaining tasks are cancelled
+    # and the first exception is raised again.
+    async def __aexit__(self, excType, exc, traceback):
+        if exc is not None: # The code inside the "async with" block failed, so we cancel all the tasks
+            for task in self.__tasks:
+                task.cancel()
+            await asyncio.gather(*self.__tasks, return_exceptions = True)
+            return False
+        try:
+            await asyncio.gather(*self.__tasks)
+        except BaseException:
+            for task in self.__tasks:
+                task.cancel()
+            await asyncio.gather(*self.__tasks, return_exceptions = True)
+            raise
+ 
+class AsyncTimedLock:
+    def __init__(self, timeout = None, name = "lock", primitive = None):
+        self.timeout = timeout 
+        self.name = name 
+        self.__lock = primitive if primitive is not None else asyncio.Lock() 
+    async def acquire(self, timeout = None):
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            await asyncio.wait_for(self.__lock.acquire(), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"could not acquire {self.name} within {timeout}s") from None
+    def release(self):
+        self.__lock.release()
+    @asynccontextmanager
+    async def hold(self, timeout = None):
+        await self.acquire(timeout)
+        try:
+            yield
+        finally:
+            self.release()
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    async def __aexit__(self, *exc):
+        self.release()
+ 
+class AsyncTimedSemaphore(AsyncTimedLock):
+    # Same as AsyncTimedLock, but up to "value" tasks can hold it at the same time
+    def __init__(self, value = 1, timeout = None, name = "semaphore"):
+        super().__init__(timeout, name, asyncio.Semaphore(value))
+ 
+async def runBlocking(function, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+ 
+# Client Code
+async def main():
+    async with TaskRunner() as runner: # Waits here until both tasks are done
+        runner.start(Hello("Task1"))
+        runner.start(Hi("Task2"))
+ 
+    lock = AsyncTimedLock(timeout = 0.1, name = "asyncLock")
+    async with lock:
+        try:
+            async with lock.hold(): # Already held, so this raises TimeoutError after 0.1s
+                pass
+        except TimeoutError as error:
+            print(error)
+ 
+    limit = AsyncTimedSemaphore(2) # At most 2 tasks inside at the same time
+    async def limited(i):
+        async with limit:
+            await asyncio.sleep(0.01)
+            return i
+    print(await asyncio.gather(*(limited(i) for i in range(5)))) # Prints "[0, 1, 2, 3, 4]"
+ 
+    print(await runBlocking(time.sleep, 0.1)) # Prints "None", the event loop kept running during the sleep
+ 
+if __name__ == "__main__":
+    asyncio.run(main())
+ 
+    # Now lets start 10000 workers which wait for 1 second each, once with threads and once with asyncio.
+    # tracemalloc only sees memory allocated by Python, the thread stacks are not included, so the real
+    # difference for threads is even bigger than what is printed.
+    count = 10000
+ 
+    tracemalloc.start()
+    start = time.perf_counter()
+    threads = [threading.Thread(target = time.sleep, args = (1,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    peak = tracemalloc.get_traced_memory()[1]
+    for t in threads:
+        t.join()
+    print(f"Threads: {time.perf_counter() - start:.2f}s, {peak / 1024 / 1024:.1f} MB")
+    tracemalloc.stop()
+    del threads
+ 
+    async def sleepers():
+        await asyncio.gather(*(asyncio.sleep(1) for i in range(count)))
+    tracemalloc.start()
+    start = time.perf_counter()
+    asyncio.run(sleepers())
+    peak = tracemalloc.get_traced_memory()[1]
+    print(f"Asyncio: {time.perf_counter() - start:.2f}s, {peak / 1024 / 1024:.1f} MB")
+    tracemalloc.stop()
@@ -0,0 +1,193 @@
+'''
+Locks in Python:
+ 
+In our Multi-threading example with Lock, Hello() calls lock.acquire() before its loop of 10 prints and
+lock.release() after the loop. This has two problems:
+ 
+--- The lock is held for the whole loop, including the time.sleep(1) calls, so the second thread cannot
+do anything until the first thread has finished all its work. The two threads run one after the other.
+--- If anything inside the loop raises an exception, lock.release() is never called and the lock stays
+held forever, so every other thread waiting for it hangs.
+ 
+The fix is to hold a lock only around the code which really touches the shared resource, and to always
+use it with a "with" block, which releases the lock even when an exception is raised.
+Below we also have a few more locking tools for bigger programs:
+--- TimedLock: a lock used with "with", which raises TimeoutError instead of waiting forever.
+--- StripedLock: a fixed set of locks for keyed resources, so threads working on different keys do not
+    wait for each other.
+--- ReadWriteLock: many readers can hold it at the same time, but a writer holds it alone.
+--- LockProfiler: adds up the wait time and hold time of every acquire per lock and per thread, so we can find
+    the locks where our threads spend time waiting. It keeps running totals, so its memory does not grow with
+    the number of acquires.
+ 
+'''
+ 
+import threading, time
+from contextlib import contextmanager
+ 
+# Fine-grained version of our Hello() function, the lock is only held around the print
+lock = threading.Lock()
+def Hello():
+    for i in range(3):
+        with lock: # Released at the end of the block, even if print() raises an exception
+            print(f'{threading.current_thread().name} is printing Hello')
+        time.sleep(0.1) # Sleeping without the lock, so the other thread can print in the meantime
+ 
+class TimedLock:
+    def __init__(self, timeout = None, name = "lock"):
+        self.timeout = timeout # Default timeout in seconds, None means wait forever
+        self.name = name 
+        self.__lock = threading.Lock() 
+    def acquire(self, timeout = None):
+        timeout = self.timeout if timeout is None else timeout
+        if not self.__lock.acquire(timeout = -1 if timeout is None else timeout):
+            raise TimeoutError(f"{threading.current_thread().name} could not acquire {self.name} within {timeout}s")
+    def release(self):
+        self.__lock.release()
+    # "with timedLock:" uses the default timeout, "with timedLock.hold(0.5):" uses a different one
+    @contextmanager
+    def hold(self, timeout = None):
+        self.acquire(timeout)
+        try:
+            yield
+        finally:
+            self.release()
+    def __enter__(self):
+        self.acquire()
+        return self
+    def __exit__(self, *exc):
+        self.release()
+ 
+class StripedLock:
+    def __init__(self, stripes = 16):
+        self.__locks = [threading.Lock() for i in range(stripes)]
+    # Returns the lock for a key, the same key always gets the same lock
+    def get(self, key):
+        return self.__locks[hash(key) % len(self.__locks)]
+ 
+class ReadWriteLock:
+    def __init__(self):
+        self.__condition = threading.Condition(threading.Lock())
+        self.__readers = 0 # Number of threads reading right now
+        self.__writer = False # True while a thread is writing
+        self.__waitingWriters = 0 # New readers wait while a writer is waiting, so writers are not starved
+    @contextmanager
+    def reading(self):
+        with self.__condition:
+            while self.__writer or self.__waitingWriters:
+                self.__condition.wait()
+            self.__readers += 1
+        try:
+            yield
+        finally:
+            with self.__condition:
+                self.__readers -= 1
+                if self.__readers == 0:
+                    self.__condition.notify_all()
+    @contextmanager
+    def writing(self):
+        with self.__condition:
+            self.__waitingWriters += 1
+            while self.__writer or self.__readers:
+                self.__condition.wait()
+            self.__waitingWriters -= 1
+            self.__writer = True
+        try:
+            yield
+        finally:
+            with self.__condition:
+                self.__writer = False
+                self.__condition.notify_all()
+ 
+class LockProfiler:
+    def __init__(self):
+        self.totals = {} # (lock name, thread name) -> [acquires, total wait, total hold, longest wait]
+        self.__totalsLock = threading.Lock() 
+    # Wraps a lock (Lock, RLock or any lock from above which works with "with") so that its use gets recorded
+    @contextmanager
+    def profile(self, lock, name = "lock"):
+        requested = time.perf_counter()
+        with lock:
+            acquired = time.perf_counter()
+            try:
+                yield
+            finally:
+                released = time.perf_counter()
+                wait = acquired - requested
+                key = (name, threading.current_thread().name)
+                with self.__totalsLock:
+                    total = self.totals.get(key)
+                    if total is None:
+                        total = self.totals[key] = [0, 0.0, 0.0, 0.0]
+                    total[0] += 1
+                    total[1] += wait
+                    total[2] += released - acquired
+                    total[3] = max(total[3], wait)
+    # Total wait and hold time per lock, sorted with the most waited for lock first
+    def report(self):
+        with self.__totalsLock:
+            rows = list(self.totals.items())
+        report = {}
+        for (name, threadName), (acquires, wait, hold, maxWait) in rows:
+            total = report.setdefault(name, {"acquires": 0, "wait": 0.0, "hold": 0.0, "maxWait": 0.0})
+            total["acquires"] += acquires
+            total["wait"] += wait
+            total["hold"] += hold
+            total["maxWait"] = max(total["maxWait"], maxWait)
+        return dict(sorted(report.items(), key = lambda item: item[1]["wait"], reverse = True))
+ 
+# Client Code
+if __name__ == "__main__":
+    t1 = threading.Thread(target = Hello, name = "Thread1")
+    t2 = threading.Thread(target = Hello, name = "Thread2")
+    t1.start()
+    t2.start()
+    t1.join()
+    t2.join() # Thread1 and Thread2 print in turns instead of one after the other
+ 
+    timedLock = TimedLock(timeout = 0.1, name = "timedLock")
+    with timedLock: # Acquired, and released at the end of the block
+        try:
+            with timedLock.hold(): # Already held, so this raises TimeoutError after 0.1s
+                pass
+        except TimeoutError as error:
+            print(error)
+ 
+    accounts = {"alice": 0, "bob": 0}
+    accountLocks = StripedLock()
+    def deposit(name):
+        for i in range(1000):
+            with accountLocks.get(name): # Threads depositing to different accounts usually take different locks
+                accounts[name] += 1
+    threads = [threading.Thread(target = deposit, args = (name,)) for name in ("alice", "bob", "alice", "bob")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(accounts) # Prints "{'alice': 2000, 'bob': 2000}"
+ 
+    config = {"debug": False}
+    configLock = ReadWriteLock()
+    with configLock.reading(): # Any number of threads can read at the same time
+        print(config["debug"]) # Prints "False"
+    with configLock.writing(): # Only one thread writes, and no thread reads while it writes
+        config["debug"] = True
+ 
+    # Profiling the coarse lock (held across the whole loop) and the fine-grained lock (held around one step)
+    profiler = LockProfiler()
+    coarseLock, fineLock = threading.Lock(), threading.Lock()
+    def coarseWorker():
+        with profiler.profile(coarseLock, "coarseLock"):
+            for i in range(5):
+                time.sleep(0.01)
+    def fineWorker():
+        for i in range(5):
+            with profiler.profile(fineLock, "fineLock"):
+                pass
+            time.sleep(0.01)
+    threads = [threading.Thread(target = worker, name = f"{worker.__name__}{i}") for worker in (coarseWorker, fineWorker) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(profiler.report()) # coarseLock shows a lot of wait time, fineLock almost none
@@ -0,0 +1,98 @@
+'''
+Multi-processing in Python:
+ 
+Threads in CPython share one Global Interpreter Lock (GIL), which lets only one thread run Python code at a
+time. So threads help when our tasks are waiting (I/O-bound), but for CPU-bound work, like building millions
+of houses or cloning prototypes, adding threads does not make it faster than one core.
+ 
+Processes do not share the GIL, every process has its own interpreter. So here we have a ProcessWorkerPool
+with the same submit()/map()/shutdown() methods as our WorkerPool from the Thread Pool example, but the
+tasks run in separate processes:
+--- map() sends the items to the processes in chunks, so we pay the cost of sending data between processes
+    once per chunk and not once per item.
+--- mapToSharedMemory() lets every process write its numeric results straight into a shared memory buffer,
+    so large results do not have to be pickled and sent back.
+--- warmUpModules are imported by every process when it starts, so the first task does not pay for the imports.
+ 
+'''
+ 
+import importlib, os, struct, time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+ 
+# Runs once in every worker process when it starts
+def _warmUp(modules):
+    for module in modules:
+        importlib.import_module(module)
+ 
+# Runs in a worker process: applies function to one chunk and writes each result into the shared memory
+def _writeChunk(memoryName, itemFormat, start, function, items):
+    memory = shared_memory.SharedMemory(name = memoryName)
+    try:
+        size = struct.calcsize(itemFormat)
+        for i, item in enumerate(items):
+            struct.pack_into(itemFormat, memory.buf, (start + i) * size, function(item))
+    finally:
+        memory.close()
+ 
+class ProcessWorkerPool:
+    def __init__(self, workers = None, warmUpModules = ()):
+        self.workers = workers or os.cpu_count()
+        # Start the process which tracks shared memory before the workers, so that the workers share it with us.
+        # Otherwise every worker starts its own tracker, which warns about our shared memory as leaked when it exits.
+        resource_tracker.ensure_running()
+        self.__executor = ProcessPoolExecutor(max_workers = self.workers, initializer = _warmUp, initargs = (tuple(warmUpModules),))
+    # function and its arguments must be picklable, i.e. defined at the top level of a module
+    def submit(self, function, *args, **kwargs):
+        return self.__executor.submit(function, *args, **kwargs)
+    def map(self, function, iterable, chunkSize = None):
+        items = list(iterable)
+        if chunkSize is None:
+            chunkSize = max(1, len(items) // (self.workers * 4)) # About 4 chunks for every process
+        return list(self.__executor.map(function, items, chunksize = chunkSize))
+    # Like map(), but every result must be a number in the struct format itemFormat ("d" is a float, "q" an int).
+    # Results are written into shared memory by the worker processes and returned as a list.
+    def mapToSharedMemory(self, function, iterable, itemFormat = "d", chunkSize = None):
+        items = list(iterable)
+        if chunkSize is None:
+            chunkSize = max(1, len(items) // (self.workers * 4))
+        memory = shared_memory.SharedMemory(create = True, size = max(1, len(items) * struct.calcsize(itemFormat)))
+        try:
+            futures = [self.__executor.submit(_writeChunk, memory.name, itemFormat, start, function, items[start:start + chunkSize])
+                       for start in range(0, len(items), chunkSize)]
+            for future in futures:
+                future.result() # Raises the exception again if a chunk failed
+            return [value for (value,) in struct.iter_unpack(itemFormat, memory.buf[:len(items) * struct.calcsize(itemFormat)])]
+        finally:
+            memory.close()
+            memory.unlink()
+    def shutdown(self):
+        self.__executor.shutdown(wait = True)
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.shutdown()
+ 
+# CPU-bound task, it only computes and never waits
+def sumOfSquares(n):
+    return float(sum(i * i for i in range(n)))
+ 
+# Client Code
+# Worker processes import this file again when they start (on Windows and macOS), so the client code must
+# be inside this "if" block, otherwise every worker process would run it again.
+if __name__ == "__main__":
+    with ProcessWorkerPool(workers = 2, warmUpModules = ["json"]) as pool:
+        print(pool.submit(sumOfSquares, 10).result()) # Prints "285.0"
+        print(pool.map(sumOfSquares, [1, 2, 3, 4])) # Prints "[0.0, 1.0, 5.0, 14.0]"
+        print(pool.mapToSharedMemory(sumOfSquares, [1, 2, 3, 4])) # Prints "[0.0, 1.0, 5.0, 14.0]"
+ 
+    # Now lets see how the same CPU-bound work scales from 1 process up to the number of cores
+    tasks = [200000] * 64
+    for workers in sorted({1, 2, 4, os.cpu_count()}):
+        if workers > os.cpu_count():
+            continue
+        with ProcessWorkerPool(workers = workers) as pool:
+            pool.map(sumOfSquares, [1] * workers) # Start all the processes before we start timing
+            start = time.perf_counter()
+            pool.mapToSharedMemory(sumOfSquares, tasks)
+            print(f"{workers} processes: {time.perf_counter() - start:.3f}s")
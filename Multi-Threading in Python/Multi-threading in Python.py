@@ -11,11 +11,12 @@ def Hi():
         print(f'{current_thread().name} is printing Hi')
         sleep(1) # After printing, we suspend the execution by 1 second by using time.sleep() function
  
-t1 = Thread(target = Hello, name = "Thread1") # Target Function t1 thread executes in Hello()
-t2 = Thread(target = Hi, name = "Thread2") # Target Function t2 thread executes is Hi()
+if __name__ == "__main__":
+    t1 = Thread(target = Hello, name = "Thread1") # Target Function t1 thread executes in Hello()
+    t2 = Thread(target = Hi, name = "Thread2") # Target Function t2 thread executes is Hi()
  
-t1.start() # To start executing thread t1 
-t2.start() # To start executing thread t2
+    t1.start() # To start executing thread t1 
+    t2.start() # To start executing thread t2
  
 ############################################################################################################################
  
@@ -28,12 +29,14 @@ def Hello():
         print(f'{threading.current_thread().name} is printing Hello')
         time.sleep(1)
  
-t1 = threading.Thread(target = Hello, name = "Thread1") # Target Function t1 thread executes in Hello()
-t2 = threading.Thread(target = Hello, name  = "Thread2") # Target Function t2 thread executes is Hello()
+if __name__ == "__main__":
+    t1 = threading.Thread(target = Hello, name = "Thread1") # Target Function t1 thread executes in Hello()
+    t2 = threading.Thread(target = Hello, name  = "Thread2") # Target Function t2 thread executes is Hello()
  
-t1.start() # To start executing thread t1 
-t2.start() # To start executing thread t2
+    t1.start() # To start executing thread t1 
+    t2.start() # To start executing thread t2
  
+UnlockedHello = Hello # Keep this version without the lock, so it can be compared with the locked Hello below
  
 ###############################################################################################################################
 
@@ -50,10 +53,11 @@ def Hello():
     lock.release() # Lock gets released by the thread, and now it is available for the next thread to acquire the lock
  
  
-t1 = threading.Thread(target = Hello, name = "Thread1") # Target Function t1 thread executes in Hello()
-t2 = threading.Thread(target = Hello, name = "Thread2") # Target Function t2 thread executes is Hello()
+if __name__ == "__main__":
+    t1 = threading.Thread(target = Hello, name = "Thread1") # Target Function t1 thread executes in Hello()
+    t2 = threading.Thread(target = Hello, name = "Thread2") # Target Function t2 thread executes is Hello()
  
-t1.start() # To start executing thread t1 
-t2.start() # To start executing thread t2
+    t1.start() # To start executing thread t1 
+    t2.start() # To start executing thread t2
  
 ##################################################################################################################################
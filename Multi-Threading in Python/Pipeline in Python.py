@@ -0,0 +1,158 @@
+'''
+Streaming Pipeline in Python:
+ 
+Our patterns work on one object per call: ShapeFactory.getShape() returns one shape, HouseBuilder.build()
+returns one house, and the results are collected in lists or printed. If an ingest job reads millions of
+product specs, turns them into objects with the factories and builders, and writes them out, collecting
+each step into a list first means the whole input has to fit in memory.
+ 
+A pipeline connects the steps with generators instead. Every stage takes items from the previous stage
+one at a time and hands its results to the next stage, so only a few items are in memory at any time,
+no matter how large the input is.
+ 
+--- A stage can run on a thread pool (for I/O-bound work) or a process pool (for CPU-bound work). At most
+bufferSize items are in flight in such a stage, so a fast stage cannot run ahead and fill the memory.
+--- A parallel stage can return its results in the input order (ordered = True) or as soon as they are
+ready (ordered = False), which is faster when some items take longer than others.
+--- Every stage measures its busy time, i.e. the time spent in its own function, and not the time it waits for
+the previous stage. So stats() shows how many items per second each stage could handle on its own, and the
+stage with the lowest number is the bottleneck of the pipeline.
+ 
+'''
+ 
+import collections, time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+ 
+class StageStats:
+    def __init__(self, name):
+        self.name = name 
+        self.items = 0 # Number of items this stage has processed
+        self.busy = 0.0 # Seconds spent in the stage's function, added up over all its workers
+    # Items per second of busy time. For a parallel stage this is per worker, as the busy time of all the
+    # workers is added up.
+    def throughput(self):
+        return self.items / self.busy if self.busy else 0.0
+ 
+# Runs in the worker of a parallel stage, so the time measured is only the work and not the time the item
+# waited in the pool. It is a module level function, so a process pool can pickle it.
+def timedCall(function, item):
+    start = time.perf_counter()
+    result = function(item)
+    return result, time.perf_counter() - start
+ 
+class Pipeline:
+    def __init__(self, source, bufferSize = 1000):
+        self.source = source # Any iterable, it is read lazily
+        self.bufferSize = bufferSize # Maximum number of items in flight in a parallel stage
+        self.__stages = [] # (StageStats, function which turns an iterator into an iterator)
+    # Adds a stage which calls function on every item. workers = 0 runs it in the calling thread,
+    # otherwise it runs on a pool of that many threads (executor = "thread") or processes (executor = "process").
+    def map(self, function, workers = 0, executor = "thread", ordered = True, name = None):
+        stats = StageStats(name or getattr(function, "__name__", "map"))
+        if workers:
+            def stage(items):
+                return self.__parallel(stats, function, items, workers, executor, ordered)
+        else:
+            def stage(items):
+                return Pipeline.__serial(stats, function, items)
+        self.__stages.append((stats, stage))
+        return self # Returning self lets us chain stages, like our HouseBuilder
+    def filter(self, predicate, name = None):
+        stats = StageStats(name or getattr(predicate, "__name__", "filter"))
+        def stage(items):
+            checked = Pipeline.__serial(stats, lambda item: (item, predicate(item)), items)
+            return (item for item, keep in checked if keep)
+        self.__stages.append((stats, stage))
+        return self
+    # Calls function on every item in the calling thread, timing only the call itself
+    @staticmethod
+    def __serial(stats, function, items):
+        clock = time.perf_counter
+        for item in items:
+            start = clock()
+            result = function(item)
+            stats.busy += clock() - start
+            stats.items += 1
+            yield result
+    def __parallel(self, stats, function, items, workers, executor, ordered):
+        poolClass = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+        with poolClass(max_workers = workers) as pool:
+            pending = collections.deque() if ordered else set()
+            for item in items:
+                if len(pending) >= self.bufferSize: # Buffer is full, hand results on before reading more input
+                    yield from self.__drain(stats, pending, ordered, all = False)
+                future = pool.submit(timedCall, function, item)
+                pending.append(future) if ordered else pending.add(future)
+            yield from self.__drain(stats, pending, ordered, all = True)
+    # Yields finished results. If all is False, only yields until there is room for new items again.
+    # The busy time measured by the workers is added here, in the thread running the pipeline, so no lock is needed.
+    @staticmethod
+    def __drain(stats, pending, ordered, all):
+        while pending:
+            if ordered:
+                done = [pending.popleft()] # Waits for the oldest item, so the input order is kept
+            else:
+                done, notDone = wait(pending, return_when = FIRST_COMPLETED)
+                pending.difference_update(done)
+            for future in done:
+                result, busy = future.result()
+                stats.busy += busy
+                stats.items += 1
+                yield result
+            if not all:
+                return
+    def __iter__(self):
+        items = iter(self.source)
+        for stats, stage in self.__stages:
+            items = stage(items)
+        return items
+    # Runs the whole pipeline, passing every result to consumer. Returns the number of results.
+    def run(self, consumer = None):
+        count = 0
+        for item in self:
+            if consumer is not None:
+                consumer(item)
+            count += 1
+        return count
+    def stats(self):
+        return {stats.name: {"items": stats.items, "busySeconds": round(stats.busy, 4), "itemsPerSecond": round(stats.throughput())} for stats, stage in self.__stages}
+ 
+# Client Code
+if __name__ == "__main__":
+    import os, sys, tracemalloc
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    import design_patterns
+ 
+    # Our input, a generator of product specs like "shape:Circle" or "house:2:Black:Pointy". It is never
+    # turned into a list, so it could just as well be reading lines from a huge file.
+    def readSpecs(count):
+        shapes = ["Circle", "Square", "Rectangle"]
+        for i in range(count):
+            yield f"shape:{shapes[i % 3]}" if i % 2 else f"house:{2 + i % 2}:Black:Pointy"
+ 
+    def resolve(spec): # Factory stage, turns a spec into an object or a builder
+        kind, *values = spec.split(":")
+        if kind == "shape":
+            return design_patterns.ShapeFactory.getShape(values[0])
+        return design_patterns.HouseBuilder().setStories(int(values[0])).setDoorType(values[1]).setRoofType(values[2])
+    def assemble(product): # Builder stage, builds the houses and passes the shapes on
+        return product.build() if isinstance(product, design_patterns.HouseBuilder) else product
+    def write(product): # Stands for writing the product to a file or a database
+        time.sleep(0.0001)
+        return type(product).__name__
+ 
+    written = collections.Counter()
+    pipeline = (Pipeline(readSpecs(5000), bufferSize = 100)
+                .map(resolve)
+                .map(assemble)
+                .map(write, workers = 8, ordered = False))
+    pipeline.run(lambda name: written.update([name])) # Counts what kind of products were written
+    print(written.most_common()) # Prints how many Houses and how many shapes of each type were written
+    print(pipeline.stats()) # write has by far the lowest itemsPerSecond, it is the stage to give more workers
+ 
+    # The memory used stays the same when the input gets 10 times bigger
+    for count in (10000, 100000):
+        tracemalloc.start()
+        Pipeline(readSpecs(count), bufferSize = 100).map(resolve).map(assemble).map(type, workers = 4).run()
+        print(f"{count} specs: peak memory {tracemalloc.get_traced_memory()[1] / 1024:.0f} KB")
+        tracemalloc.stop()
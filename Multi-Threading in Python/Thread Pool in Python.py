@@ -0,0 +1,132 @@
+'''
+Thread Pool:
+ 
+In our Multi-threading examples we create a new Thread for every function (Hello, Hi), start it,
+and never wait for it to finish. This is fine for a demo, but if we have thousands of tasks then creating
+one thread per task costs time and memory, and nothing stops us from creating more threads than the
+machine can handle.
+ 
+A thread pool creates a fixed number of worker threads once. Tasks are put into a queue, and every worker
+keeps taking the next task from the queue and running it. The queue has a maximum size, so if the workers
+cannot keep up, submit() waits until there is room in the queue (this is called backpressure).
+And at the end we shut the pool down gracefully, i.e. the workers finish the queued tasks and we join them.
+ 
+'''
+ 
+import threading, time, queue
+from concurrent.futures import Future
+ 
+class WorkerPool:
+    __stop = object() # Special task which tells a worker to stop
+    def __init__(self, workers = 4, maxQueueSize = 100, name = "Worker"):
+        self.__tasks = queue.Queue(maxsize = maxQueueSize) # submit() blocks when the queue is full
+        self.__metricsLock = threading.Lock() 
+        # Running totals instead of one latency per task, so the metrics use the same memory for any number of tasks
+        self.__tasksDone = 0 
+        self.__latencySum = 0.0 # Seconds from submit() until the task finished, added up over all the tasks
+        self.__maxLatency = 0.0 
+        self.__busyTime = 0.0 # Total seconds all the workers spent running tasks
+        self.__submitLock = threading.Lock() # So that no task can be queued behind the stop tasks
+        self.__shutdown = False 
+        self.__started = time.perf_counter()
+        self.__threads = [threading.Thread(target = self.__work, name = f"{name}{i + 1}") for i in range(workers)]
+        for t in self.__threads:
+            t.start()
+    # Every worker thread runs this loop until it gets the stop task
+    def __work(self):
+        while True:
+            task = self.__tasks.get()
+            if task is WorkerPool.__stop:
+                return
+            future, function, args, kwargs, submitted = task
+            if future.set_running_or_notify_cancel(): # Skip the task if it was cancelled while waiting
+                start = time.perf_counter()
+                try:
+                    future.set_result(function(*args, **kwargs))
+                except BaseException as error:
+                    future.set_exception(error)
+                end = time.perf_counter()
+                with self.__metricsLock:
+                    self.__tasksDone += 1
+                    self.__latencySum += end - submitted
+                    self.__maxLatency = max(self.__maxLatency, end - submitted)
+                    self.__busyTime += end - start
+    # Puts a task into the queue and returns a Future, future.result() waits for the task and returns its result.
+    # Raises RuntimeError after shutdown(), as no worker would ever run the task and future.result() would wait forever.
+    def submit(self, function, *args, **kwargs):
+        future = Future()
+        with self.__submitLock:
+            if self.__shutdown:
+                raise RuntimeError("cannot submit a task after shutdown()")
+            self.__tasks.put((future, function, args, kwargs, time.perf_counter()))
+        return future
+    def map(self, function, iterable):
+        return [future.result() for future in [self.submit(function, item) for item in iterable]]
+    # Lets the workers finish all the queued tasks, then stops and joins them
+    def shutdown(self):
+        with self.__submitLock:
+            if self.__shutdown:
+                return
+            self.__shutdown = True
+        for t in self.__threads:
+            self.__tasks.put(WorkerPool.__stop)
+        for t in self.__threads:
+            t.join()
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.shutdown()
+    def metrics(self):
+        with self.__metricsLock:
+            tasksDone, latencySum, maxLatency, busyTime = self.__tasksDone, self.__latencySum, self.__maxLatency, self.__busyTime
+        elapsed = time.perf_counter() - self.__started
+        return {
+            "tasks": tasksDone,
+            "queueDepth": self.__tasks.qsize(),
+            "averageLatency": latencySum / tasksDone if tasksDone else 0.0,
+            "maxLatency": maxLatency,
+            "utilization": busyTime / (elapsed * len(self.__threads)), # Fraction of time the workers were busy
+        }
+ 
+def Hello():
+    for i in range(3):
+        print(f'{threading.current_thread().name} is printing Hello')
+        time.sleep(0.1)
+ 
+def Hi():
+    for i in range(3):
+        print(f'{threading.current_thread().name} is printing Hi')
+        time.sleep(0.1)
+ 
+# Client Code
+if __name__ == "__main__":
+    with WorkerPool(workers = 2, name = "Thread") as pool: # Workers are named "Thread1" and "Thread2"
+        pool.submit(Hello)
+        pool.submit(Hi)
+    # Leaving the "with" block waits for both tasks and joins the workers
+    print(pool.metrics())
+    try:
+        pool.submit(Hello)
+    except RuntimeError as error:
+        print(error) # Prints "cannot submit a task after shutdown()"
+ 
+    # Now lets compare one raw thread per task with the pool, for 500 I/O-bound tasks which wait 10ms each
+    # With 50 workers the pool runs at most 50 tasks at a time, so it may take a little longer than 500 threads,
+    # but the number of threads stays fixed no matter how many tasks we submit.
+    def ioTask():
+        time.sleep(0.01) # Stands for waiting on a network call or a file
+ 
+    start = time.perf_counter()
+    threads = [threading.Thread(target = ioTask) for i in range(500)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"One thread per task: {time.perf_counter() - start:.3f}s, 500 threads created")
+ 
+    start = time.perf_counter()
+    with WorkerPool(workers = 50, maxQueueSize = 100) as pool:
+        for i in range(500):
+            pool.submit(ioTask)
+    print(f"WorkerPool: {time.perf_counter() - start:.3f}s, 50 threads created")
+    print(pool.metrics())
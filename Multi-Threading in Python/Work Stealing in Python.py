@@ -0,0 +1,207 @@
+'''
+Work Stealing in Python:
+ 
+In our Multi-threading examples every thread gets one fixed function (t1 -> Hello, t2 -> Hi). If the work
+of one thread is much bigger than the work of the other, the second thread finishes early and sits idle
+while the first one is still busy.
+ 
+A work stealing scheduler gives every worker thread its own deque (double ended queue) of tasks:
+--- A worker takes tasks from the front of its own deque.
+--- When its own deque is empty, it steals a task from the back (the tail) of another worker's deque, so
+no worker sits idle while there is still work waiting anywhere.
+--- A task can be submitted with an affinity hint, i.e. the worker which should preferably run it (for example
+the worker which already has the data in its cache). Without a hint tasks are spread round robin.
+ 
+Instead of the fixed sleep(1) loops, our tasks take a CancellationToken and wait on it. When the token is
+cancelled, every waiting task wakes up at once and stops, instead of finishing all its sleeps. A cancelled
+scheduler stays cancelled, so it does not accept new tasks anymore (they would only be skipped).
+ 
+'''
+ 
+import collections, itertools, queue, random, threading, time
+from concurrent.futures import Future
+ 
+class CancellationToken:
+    def __init__(self):
+        self.__event = threading.Event() 
+    def cancel(self):
+        self.__event.set()
+    def isCancelled(self):
+        return self.__event.is_set()
+    # Sleeps for the given seconds, but wakes up early if the token is cancelled. Returns True if cancelled.
+    def sleep(self, seconds):
+        return self.__event.wait(seconds)
+ 
+class WorkStealingScheduler:
+    def __init__(self, workers = 4, name = "Worker"):
+        self.__deques = [collections.deque() for i in range(workers)] # append/popleft/pop on a deque are thread-safe
+        self.__next = itertools.count() # Used to spread tasks without an affinity hint
+        self.__pending = 0 # Tasks submitted but not finished yet
+        self.__submitted = 0 # Tasks submitted so far, an idle worker only sleeps if this did not change since its last look
+        self.__condition = threading.Condition() # Idle workers wait here for new tasks
+        self.__stopping = False 
+        self.token = CancellationToken() # Passed to every task, cancel() asks all the tasks to stop
+        self.steals = [0] * workers # Number of tasks every worker stole from the others
+        self.__threads = [threading.Thread(target = self.__work, args = (i,), name = f"{name}{i + 1}") for i in range(workers)]
+        for t in self.__threads:
+            t.start()
+    # Adds a task, function is called as function(token, *args). affinity is the index of the preferred worker.
+    # Returns a Future like our WorkerPool, future.result() returns the result or raises the error of the task.
+    def submit(self, function, *args, affinity = None):
+        index = affinity if affinity is not None else next(self.__next)
+        future = Future()
+        with self.__condition:
+            if self.__stopping:
+                raise RuntimeError("cannot submit a task after shutdown()")
+            if self.token.isCancelled():
+                raise RuntimeError("cannot submit a task after cancel()")
+            self.__pending += 1
+            self.__submitted += 1
+            self.__deques[index % len(self.__deques)].append((future, function, args))
+            self.__condition.notify() # Wakes one idle worker
+        return future
+    def __findTask(self, index):
+        try:
+            return self.__deques[index].popleft() # Our own tasks, oldest first
+        except IndexError:
+            pass
+        others = list(range(len(self.__deques)))
+        random.shuffle(others) # Steal from a random worker, so that thieves do not all pick on the same one
+        for other in others:
+            if other != index:
+                try:
+                    task = self.__deques[other].pop() # Steal from the tail
+                    self.steals[index] += 1
+                    return task
+                except IndexError:
+                    pass
+        return None
+    # The deques are searched without the lock, so a task can be submitted right after a worker found nothing.
+    # The worker remembers how many tasks were submitted before it looked, and only waits if that number is
+    # still the same, otherwise it looks again. As submit() changes the number and notifies while holding the
+    # lock, a new task either makes the worker look again or wakes it up, and it never needs to poll.
+    def __work(self, index):
+        while True:
+            submitted = self.__submitted
+            task = self.__findTask(index)
+            if task is None:
+                with self.__condition:
+                    if self.__stopping and self.__pending == 0:
+                        return
+                    if self.__submitted == submitted:
+                        self.__condition.wait() # Woken by submit(), by the last finished task or by shutdown()
+                continue
+            future, function, args = task
+            try:
+                if self.token.isCancelled(): # Tasks which did not start yet are skipped after cancel()
+                    future.cancel()
+                elif future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(function(self.token, *args))
+                    except BaseException as error: # The error goes to the Future, the worker keeps running
+                        future.set_exception(error)
+            finally:
+                with self.__condition:
+                    self.__pending -= 1
+                    if self.__pending == 0:
+                        self.__condition.notify_all()
+    # Waits until every submitted task is finished (or skipped after cancel()), then stops the workers
+    def shutdown(self):
+        with self.__condition:
+            self.__stopping = True
+            self.__condition.notify_all()
+        for t in self.__threads:
+            t.join()
+    # Asks every running task to stop, skips the tasks which did not start yet, and rejects new tasks
+    def cancel(self):
+        with self.__condition: # So a submit() running at the same time either finishes first or sees the cancel
+            self.token.cancel()
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.shutdown()
+ 
+# Our Hello() and Hi() functions, which wait on the token instead of calling sleep(1)
+def Hello(token, steps = 5):
+    for i in range(steps):
+        print(f'{threading.current_thread().name} is printing Hello')
+        if token.sleep(0.1): # Returns True as soon as the token is cancelled
+            print(f'{threading.current_thread().name} stopped Hello')
+            return
+ 
+def Hi(token, steps = 5):
+    for i in range(steps):
+        print(f'{threading.current_thread().name} is printing Hi')
+        if token.sleep(0.1):
+            print(f'{threading.current_thread().name} stopped Hi')
+            return
+ 
+# Client Code
+if __name__ == "__main__":
+    with WorkStealingScheduler(workers = 2, name = "Thread") as scheduler:
+        scheduler.submit(Hello, 3, affinity = 0) # Preferably run by Thread1
+        scheduler.submit(Hi, 3, affinity = 0) # Also given to Thread1, but Thread2 is idle so it steals this task
+    print(scheduler.steals) # Prints "[0, 1]", Thread2 stole one task
+    try:
+        scheduler.submit(Hello, 3)
+    except RuntimeError as error:
+        print(error) # Prints "cannot submit a task after shutdown()"
+ 
+    with WorkStealingScheduler(workers = 2) as scheduler:
+        failed = scheduler.submit(lambda token: 1 / 0)
+        done = scheduler.submit(lambda token: "done")
+    print(repr(failed.exception()), done.result()) # Prints "ZeroDivisionError('division by zero') done"
+ 
+    scheduler = WorkStealingScheduler(workers = 2, name = "Thread")
+    scheduler.submit(Hello, 100)
+    scheduler.submit(Hi, 100)
+    time.sleep(0.25)
+    scheduler.cancel() # Both tasks stop right away instead of running for 10 more seconds
+    try:
+        scheduler.submit(Hello, 3)
+    except RuntimeError as error:
+        print(error) # Prints "cannot submit a task after cancel()"
+    scheduler.shutdown()
+ 
+    # Now lets compare the scheduler with one shared queue.Queue, and with fixed tasks per thread like our
+    # t1 -> Hello, t2 -> Hi example, for 200 tasks where a few tasks are much longer than the rest.
+    # All the tasks are given to the first worker (affinity 0), like work produced by a single thread.
+    durations = [random.Random(i).paretovariate(1.5) * 0.002 for i in range(200)] # Most are short, a few are long
+    workers = 8
+    def task(token, seconds):
+        time.sleep(seconds)
+ 
+    start = time.perf_counter()
+    with WorkStealingScheduler(workers = workers) as scheduler:
+        for seconds in durations:
+            scheduler.submit(task, seconds, affinity = 0)
+    print(f"Work stealing: {time.perf_counter() - start:.3f}s, steals per worker: {scheduler.steals}")
+ 
+    start = time.perf_counter()
+    shared = queue.Queue()
+    for seconds in durations:
+        shared.put(seconds)
+    def sharedWorker():
+        while True:
+            try:
+                seconds = shared.get_nowait()
+            except queue.Empty:
+                return
+            time.sleep(seconds)
+    threads = [threading.Thread(target = sharedWorker) for i in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"Shared queue.Queue: {time.perf_counter() - start:.3f}s")
+ 
+    start = time.perf_counter()
+    def fixedWorker(index): # Every thread gets a fixed share of the tasks, and nobody helps anybody else
+        for seconds in durations[index::workers]:
+            time.sleep(seconds)
+    threads = [threading.Thread(target = fixedWorker, args = (i,)) for i in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"Fixed tasks per thread: {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,298 @@
+'''
+Benchmark Suite for the Design Patterns:
+
+This file times every creational pattern and the threading examples, and can compare the results with a
+saved baseline so that we notice when a change makes something slower.
+
+--- Micro benchmarks time one small operation, like one ShapeFactory.getShape() call, many times and
+report the time of a single operation.
+--- Macro benchmarks time a bigger piece of work once, like building 100000 houses or running the Hello()
+threads, and report the time of the whole run.
+
+Every benchmark is run "repeat" times and the fastest run is kept, because the slower runs are slowed
+down by other things happening on the machine, not by our code.
+
+Usage:
+    python benchmark.py                                   # Run everything and print the results
+    python benchmark.py --filter singleton                # Run only the benchmarks whose name contains "singleton"
+    python benchmark.py --save baseline.json              # Save the results as JSON
+    python benchmark.py --baseline baseline.json --threshold 0.2
+                                                          # Fail if anything got more than 20% slower
+
+'''
+
+import argparse, asyncio, importlib.util, io, json, os, sys, threading, time, timeit, types
+from contextlib import redirect_stdout
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+MODULES = {} # path -> module loaded by loadModule()
+ 
+# The pattern files have spaces in their names, so we cannot use a normal import statement for them.
+# Their examples are inside 'if __name__ == "__main__":', so loading them only defines the classes.
+# Every file is loaded once and then reused, as loading runs its module level code again, e.g. the Singleton
+# file registers another os.register_at_fork() hook every time, and those hooks can never be removed.
+def loadModule(folder, fileName):
+    path = os.path.join(ROOT, folder, fileName)
+    module = MODULES.get(path)
+    if module is None:
+        name = fileName[:-3].replace(" ", "_").replace("-", "_").lower()
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        MODULES[path] = module
+    return module
+
+BENCHMARKS = [] # (name, kind, setup function), the setup function returns the function to be timed
+
+# Decorator which adds a benchmark. For micro benchmarks "number" is how many times the operation is run per repeat.
+def benchmark(name, kind = "micro", number = 10000):
+    def decorator(setup):
+        BENCHMARKS.append((name, kind, number if kind == "micro" else 1, setup))
+        return setup
+    return decorator
+
+##################################################################################################################
+
+# Factory
+
+@benchmark("factory.getShape")
+def factoryGetShape():
+    ShapeFactory = loadModule("Creational Design Patterns", "Factory Design Pattern.py").ShapeFactory
+    return lambda: ShapeFactory.getShape("Rectangle")
+
+@benchmark("factory.getShapes.100", number = 1000)
+def factoryGetShapes():
+    ShapeFactory = loadModule("Creational Design Patterns", "Factory Design Pattern.py").ShapeFactory
+    shapeTypes = ["Circle", "Square", "Rectangle", "Triangle"] * 25
+    return lambda: ShapeFactory.getShapes(shapeTypes)
+
+@benchmark("factory.getShape.keyed")
+def factoryGetShapeKeyed():
+    factory = loadModule("Creational Design Patterns", "Factory Design Pattern.py")
+    key = factory.ShapeType.Rectangle
+    return lambda: factory.KeyedShapeFactory.getShape(key)
+
+# Abstract Factory
+
+@benchmark("abstractFactory.getCarType.getCar")
+def abstractFactoryTwoSteps():
+    CarTypeFactory = loadModule("Creational Design Patterns", "Abstract Factory Design Pattern.py").CarTypeFactory
+    return lambda: CarTypeFactory.getCarType("Sedan").getCar("Audi")
+
+@benchmark("abstractFactory.getCar")
+def abstractFactoryFlattened():
+    CarTypeFactory = loadModule("Creational Design Patterns", "Abstract Factory Design Pattern.py").CarTypeFactory
+    return lambda: CarTypeFactory.getCar("Sedan", "Audi")
+
+@benchmark("abstractFactory.getCar.keyed")
+def abstractFactoryKeyed():
+    abstractFactory = loadModule("Creational Design Patterns", "Abstract Factory Design Pattern.py")
+    type, company = abstractFactory.CarType.Sedan, abstractFactory.Company.Audi
+    return lambda: abstractFactory.KeyedCarTypeFactory.getCar(type, company)
+
+@benchmark("abstractFactory.bulk_create.100", number = 1000)
+def abstractFactoryBulk():
+    CarTypeFactory = loadModule("Creational Design Patterns", "Abstract Factory Design Pattern.py").CarTypeFactory
+    pairs = [("SUV", "Volvo"), ("Sedan", "Audi")] * 50
+    return lambda: CarTypeFactory.bulk_create(pairs)
+
+# Builder and Director
+
+@benchmark("builder.chain")
+def builderChain():
+    HouseBuilder = loadModule("Creational Design Patterns", "Builder Design Pattern.py").HouseBuilder
+    return lambda: HouseBuilder().setStories(2).setDoorType("Black").setRoofType("Pointy").build()
+
+@benchmark("director.build_one_story_house")
+def directorOneStory():
+    builder = loadModule("Creational Design Patterns", "Builder Design Pattern.py")
+    director = builder.Director(builder.HouseBuilder())
+    return director.build_one_story_house
+
+@benchmark("director.build_many.list.100000", kind = "macro")
+def directorBuildManyList():
+    builder = loadModule("Creational Design Patterns", "Builder Design Pattern.py")
+    director = builder.Director(builder.HouseBuilder())
+    return lambda: director.build_many(builder.Director.ONE_STORY_HOUSE, 100000)
+
+@benchmark("director.build_many.columnar.100000", kind = "macro")
+def directorBuildManyColumnar():
+    builder = loadModule("Creational Design Patterns", "Builder Design Pattern.py")
+    director = builder.Director(builder.HouseBuilder())
+    return lambda: director.build_many(builder.Director.ONE_STORY_HOUSE, 100000, output = "columnar")
+
+@benchmark("frozenDirector.build_one_story_house")
+def frozenDirectorOneStory():
+    return loadModule("Creational Design Patterns", "Builder Design Pattern.py").FrozenDirector().build_one_story_house
+
+# Prototype
+
+@benchmark("prototype.clone.init")
+def prototypeInitClone():
+    prototype = loadModule("Creational Design Patterns", "Prototype Design Pattern.py")
+    return prototype.Student("John", 23, 1).clone
+
+@benchmark("prototype.clone.compiled")
+def prototypeCompiledClone():
+    prototype = loadModule("Creational Design Patterns", "Prototype Design Pattern.py")
+    return prototype.Student("John", 23, 1, ["Maths"]).compiledClone
+
+@benchmark("prototype.clone_many.100000", kind = "macro")
+def prototypeCloneMany():
+    prototype = loadModule("Creational Design Patterns", "Prototype Design Pattern.py")
+    student = prototype.Student("John", 23, 1, ["Maths"])
+    return lambda: student.clone_many(100000)
+
+# Singleton, all the variants
+
+SINGLETONS = {} # Name of the variant -> Singleton class, taken from the file before singletonVariant() changes it
+ 
+# The four earlier variants refer to the module level name "Singleton" (in getInstance() or in super(Singleton, cls)),
+# which now points to the last variant. So while a variant creates its instance, we point that name back to it.
+# As the file is loaded only once, the final Singleton is kept in SINGLETONS before the name is changed.
+def singletonVariant(name):
+    module = loadModule("Creational Design Patterns", "Singleton Design Pattern.py")
+    if not SINGLETONS:
+        SINGLETONS.update((variant, getattr(module, variant)) for variant in ("InitSingleton", "NewSingleton", "ThreadSafeSingleton", "DoubleLockingSingleton", "Singleton"))
+    variant = SINGLETONS[name]
+    module.Singleton = variant
+    variant.getInstance() if name == "InitSingleton" else variant()
+    return module, variant
+
+@benchmark("singleton.lazyInit.getInstance")
+def singletonLazyInit():
+    module, variant = singletonVariant("InitSingleton") # getInstance() keeps using the name, so we leave it pointing to the variant
+    return variant.getInstance
+
+@benchmark("singleton.lazyNew")
+def singletonLazyNew():
+    return singletonVariant("NewSingleton")[1]
+
+@benchmark("singleton.threadSafe")
+def singletonThreadSafe():
+    return singletonVariant("ThreadSafeSingleton")[1]
+
+@benchmark("singleton.doubleLocking")
+def singletonDoubleLocking():
+    return singletonVariant("DoubleLockingSingleton")[1]
+
+@benchmark("singleton.metaclass")
+def singletonMetaclass():
+    return singletonVariant("Singleton")[1]
+
+@benchmark("singleton.doubleLocking.64threads", kind = "macro")
+def singletonDoubleLockingThreads():
+    Singleton = singletonVariant("DoubleLockingSingleton")[1]
+    def createFromThreads():
+        def worker():
+            for i in range(1000):
+                Singleton()
+        threads = [threading.Thread(target = worker) for i in range(64)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    return createFromThreads
+
+# Threading examples. The Hello() functions print and sleep for 1 second at every step, so we hide their
+# output and make them sleep 1 millisecond instead, which keeps the thread switching but not the waiting.
+# Everything else of the time module stays the same, as the loaded files are shared by all the benchmarks.
+
+def fastTime():
+    fast = types.SimpleNamespace(**{name: value for name, value in vars(time).items() if not name.startswith("__")})
+    fast.sleep = lambda seconds: time.sleep(seconds / 1000)
+    return fast
+
+def runThreads(*targets):
+    threads = [threading.Thread(target = target, name = f"Thread{i + 1}") for i, target in enumerate(targets)]
+    with redirect_stdout(io.StringIO()):
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+@benchmark("threading.helloHi", kind = "macro")
+def threadingHelloHi():
+    module = loadModule("Multi-Threading in Python", "Multi-threading in Python.py")
+    # Like the second and third examples of the file, two threads run the Hello() without the lock, and then
+    # two threads run the final Hello() with the lock
+    module.time = fastTime()
+    return lambda: (runThreads(module.UnlockedHello, module.UnlockedHello), runThreads(module.Hello, module.Hello))
+
+@benchmark("threading.fineGrainedLock", kind = "macro")
+def threadingFineGrainedLock():
+    module = loadModule("Multi-Threading in Python", "Locks in Python.py")
+    module.time = fastTime()
+    return lambda: runThreads(module.Hello, module.Hello)
+
+@benchmark("threading.workerPool.500", kind = "macro")
+def threadingWorkerPool():
+    WorkerPool = loadModule("Multi-Threading in Python", "Thread Pool in Python.py").WorkerPool
+    def runPool():
+        with WorkerPool(workers = 50) as pool:
+            for i in range(500):
+                pool.submit(time.sleep, 0.001)
+    return runPool
+
+@benchmark("threading.asyncio.1000", kind = "macro")
+def threadingAsyncio():
+    asyncioModule = loadModule("Multi-Threading in Python", "Asyncio in Python.py")
+    async def runAll():
+        async with asyncioModule.TaskRunner() as runner:
+            for i in range(1000):
+                runner.start(asyncio.sleep(0.001))
+    return lambda: asyncio.run(runAll())
+
+##################################################################################################################
+
+# Runs the benchmarks and returns {name: {"kind", "seconds"}}, "seconds" is the time of one operation for
+# micro benchmarks and the time of the whole run for macro benchmarks.
+def runBenchmarks(nameFilter = None, repeat = 5):
+    results = {}
+    for name, kind, number, setup in BENCHMARKS:
+        if nameFilter and nameFilter.lower() not in name.lower():
+            continue
+        function = setup()
+        function() # Warm up, so the first run does not include one time costs like compiling clone functions
+        best = min(timeit.repeat(function, number = number, repeat = repeat)) / number
+        results[name] = {"kind": kind, "seconds": best}
+        print(f"{name:45} {kind:6} {best * 1e6:12.3f} us")
+    return results
+
+# Returns the benchmarks which got slower than the baseline by more than threshold (0.2 means 20%)
+def compareWithBaseline(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        if name in baseline:
+            change = result["seconds"] / baseline[name]["seconds"] - 1
+            if change > threshold:
+                regressions.append((name, change))
+    return regressions
+
+def main(arguments = None):
+    parser = argparse.ArgumentParser(description = "Benchmarks for the design pattern examples")
+    parser.add_argument("--filter", help = "only run benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type = int, default = 5, help = "number of runs per benchmark, the fastest is kept")
+    parser.add_argument("--save", help = "write the results as JSON to this file")
+    parser.add_argument("--baseline", help = "JSON file of earlier results to compare with")
+    parser.add_argument("--threshold", type = float, default = 0.2, help = "allowed slowdown compared to the baseline (0.2 = 20%%)")
+    options = parser.parse_args(arguments)
+
+    results = runBenchmarks(options.filter, options.repeat)
+    if options.save:
+        with open(options.save, "w") as file:
+            json.dump(results, file, indent = 2)
+    if options.baseline:
+        with open(options.baseline) as file:
+            baseline = json.load(file)
+        regressions = compareWithBaseline(results, baseline, options.threshold)
+        for name, change in regressions:
+            print(f"REGRESSION {name}: {change:+.0%} slower than the baseline")
+        if regressions:
+            return 1
+        print(f"No regression above {options.threshold:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
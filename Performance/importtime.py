@@ -0,0 +1,48 @@
+'''
+Import time of the design_patterns package:
+ 
+Runs "python -X importtime" in a new process for "import design_patterns" and for the first use of every
+submodule, and prints how long each one takes. -X importtime makes Python print the time spent in every
+import statement to stderr, in lines like:
+ 
+    import time: self [us] | cumulative | imported package
+    import time:       150 |        150 |   design_patterns
+ 
+Our submodules are loaded from their file path by design_patterns.__getattr__, which is not an import
+statement, so for them we measure the time of the first attribute access with time.perf_counter() and use
+-X importtime to see which standard library modules were imported while loading them.
+ 
+'''
+ 
+import os, subprocess, sys
+ 
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+import design_patterns
+ 
+def run(code):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd = ROOT, capture_output = True, text = True, check = True)
+    imports = []
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "self [us]" not in line:
+            selfTime, cumulative, name = line[len("import time:"):].split("|")
+            imports.append((name.rstrip(), int(cumulative)))
+    return imports, result.stdout.strip()
+ 
+def main():
+    imports, output = run("import design_patterns")
+    packageTime = dict(imports)[" design_patterns"]
+    print(f"{'import design_patterns':40} {packageTime / 1000:8.2f} ms")
+    for name in sorted(design_patterns._SUBMODULES):
+        code = ("import design_patterns, time\n"
+                "start = time.perf_counter()\n"
+                f"design_patterns.{name}\n"
+                "print(time.perf_counter() - start)")
+        imports, output = run(code)
+        # Top level imports (names indented by a single space) which happened after design_patterns itself was imported
+        names = [entry for entry, cumulative in imports]
+        loaded = [entry.strip() for entry in names[names.index(" design_patterns") + 1:] if not entry.startswith("  ")]
+        print(f"{'design_patterns.' + name:40} {float(output) * 1000:8.2f} ms   imports: {', '.join(loaded) or '-'}")
+ 
+if __name__ == "__main__":
+    main()
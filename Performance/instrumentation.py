@@ -0,0 +1,295 @@
+'''
+Instrumentation of the Design Patterns:
+ 
+To find out how much time our code spends in ShapeFactory.getShape(), CarTypeFactory.getCarType(),
+HouseBuilder.build() or Singleton.__new__(), we wrap these methods with a small function which counts the
+calls and measures how long each call takes.
+ 
+--- instrument(cls, "method") replaces the method with the measuring wrapper, and disable() puts the
+original methods back. So when instrumentation is disabled the original methods run exactly as before
+and there is no extra cost at all. The method may be inherited (like build() of a HouseBuilder subclass), or
+come from the metaclass (like SingletonMeta.__call__, which creates the instance of a Singleton).
+--- Latencies are recorded in a Histogram with a fixed number of buckets (like an HDR histogram), so the
+memory used does not grow with the number of calls. Every thread records into its own counters, so an
+instrumented call never waits on a lock, and calls which raise are counted as errors. The counters of threads
+which have finished are added into one total, and keys past maxKeys are counted under OTHER_KEY, so the
+memory used does not grow with the number of threads or distinct keys either.
+--- For factory methods the first argument (the type key, like "Circle") is recorded as well, so we get
+call counts, latencies and the number of created objects for every key.
+--- snapshot() returns all the numbers, which can be written to a file as JSON or in the Prometheus text format.
+ 
+'''
+ 
+import functools, inspect, json, threading, time
+ 
+class Histogram:
+    # Every power of two range of nanoseconds [2^k, 2^(k+1)) is split into SUB_BUCKETS equal buckets, so each
+    # bucket is accurate to about 1/SUB_BUCKETS of its value. 64 ranges cover every latency we will ever see.
+    SUB_BUCKETS = 8
+    def __init__(self):
+        self.counts = [0] * (64 * Histogram.SUB_BUCKETS)
+        self.total = 0
+        self.sum = 0 # Sum of all recorded values in nanoseconds
+    @staticmethod
+    def bucketOf(nanoseconds):
+        if nanoseconds < Histogram.SUB_BUCKETS:
+            return nanoseconds
+        exponent = nanoseconds.bit_length() - 1
+        subBucket = (nanoseconds >> (exponent - 3)) & (Histogram.SUB_BUCKETS - 1) # The 3 bits after the highest bit
+        return exponent * Histogram.SUB_BUCKETS + subBucket
+    # Smallest value which falls into a bucket
+    @staticmethod
+    def valueOf(bucket):
+        exponent, subBucket = divmod(bucket, Histogram.SUB_BUCKETS)
+        if exponent == 0:
+            return subBucket
+        return (1 << exponent) + (subBucket << (exponent - 3))
+    def record(self, nanoseconds):
+        self.counts[Histogram.bucketOf(nanoseconds)] += 1
+        self.total += 1
+        self.sum += nanoseconds
+    # Returns the value below which the given percent of the recorded values are
+    def percentile(self, percent):
+        if self.total == 0:
+            return 0
+        needed = self.total * percent / 100
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= needed:
+                return Histogram.valueOf(bucket)
+        return Histogram.valueOf(len(self.counts) - 1)
+ 
+# Counters of one instrumented method and one key, as seen by one thread. Only that thread ever changes them,
+# so recording a call does not need any lock. snapshot() adds up the counters of all the threads.
+class CallStats:
+    __slots__ = ("calls", "created", "errors", "counts", "sum")
+    def __init__(self):
+        self.calls = 0 
+        self.created = 0 # Calls which returned an object
+        self.errors = 0 # Calls which raised
+        self.counts = [0] * (64 * Histogram.SUB_BUCKETS) # Same buckets as Histogram
+        self.sum = 0 
+    def add(self, other):
+        self.calls += other.calls
+        self.created += other.created
+        self.errors += other.errors
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sum += other.sum
+ 
+class Instrumentation:
+    OTHER_KEY = "<other>" # Key under which the calls with keys past maxKeys are counted
+    def __init__(self, maxKeys = 1000):
+        self.maxKeys = maxKeys # Most distinct keys recorded for one target
+        self.__originals = [] # (class, method name, original attribute or None if it was inherited)
+        self.__stats = [] # (target name, key, CallStats, thread) for every live thread which called an instrumented method
+        self.__finished = {} # (target name, key) -> CallStats of all the threads which have finished
+        self.__keys = {} # target name -> set of the keys recorded for it
+        self.__compactAt = 64 # Length of __stats at which the counters of finished threads are merged
+        self.__lock = threading.Lock() # Only taken the first time a thread records a key of a target, and by snapshot()
+    # Replaces cls.methodName with a wrapper which records every call. If keyed is True, the first argument
+    # is used as the key, e.g. "Circle" for ShapeFactory.getShape("Circle").
+    # Everything the wrapper needs is looked up here once, so a call only pays for two clock reads, one
+    # dictionary lookup of its CallStats and a few additions.
+    def instrument(self, cls, methodName, keyed = False):
+        # getattr_static() finds the attribute through the MRO without running descriptors, so a staticmethod or
+        # classmethod stays wrapped (__new__ is stored as a staticmethod, even without the decorator)
+        original = inspect.getattr_static(cls, methodName)
+        onMetaclass = not any(methodName in klass.__dict__ for klass in cls.__mro__)
+        owner = type(cls) if onMetaclass else cls # Class on which the wrapper is set
+        if owner is type:
+            raise TypeError(f"{cls.__name__}.{methodName} comes from type itself and cannot be instrumented")
+        isStatic = isinstance(original, staticmethod)
+        isClassMethod = isinstance(original, classmethod)
+        function = original.__func__ if isStatic or isClassMethod else original
+        target = f"{cls.__name__}.{methodName}"
+        skip = 0 if isStatic and methodName != "__new__" else 1 # Skip self / cls when looking for the key
+        local = threading.local() # Every thread keeps its own {key -> CallStats} for this target
+        clock = time.perf_counter_ns
+        def newStats(key):
+            perThread = getattr(local, "stats", None)
+            if perThread is None:
+                perThread = local.stats = {}
+            with self.__lock:
+                keys = self.__keys.setdefault(target, set())
+                if key not in keys and len(keys) >= self.maxKeys:
+                    # Too many keys, count this one under OTHER_KEY. The key itself is not remembered, so every
+                    # call with such a key comes back here, which is slower but keeps the memory bounded.
+                    key = Instrumentation.OTHER_KEY
+                    stats = perThread.get(key)
+                    if stats is not None:
+                        return stats
+                else:
+                    keys.add(key)
+                stats = perThread[key] = CallStats()
+                self.__stats.append((target, key, stats, threading.current_thread()))
+                if len(self.__stats) >= self.__compactAt:
+                    self.__mergeFinished()
+            return stats
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            failed = True
+            result = None
+            try:
+                result = function(*args, **kwargs)
+                failed = False
+                return result
+            finally: # Calls which raise are recorded too
+                nanoseconds = clock() - start
+                key = args[skip] if keyed and len(args) > skip else None
+                try:
+                    stats = local.stats[key]
+                except (AttributeError, KeyError): # First call of this thread, or first call with this key
+                    stats = newStats(key)
+                stats.calls += 1
+                if failed:
+                    stats.errors += 1
+                elif result is not None:
+                    stats.created += 1
+                # Same as Histogram.bucketOf(nanoseconds) with 8 sub buckets, written out to save a function call
+                if nanoseconds < 8:
+                    stats.counts[nanoseconds] += 1
+                else:
+                    exponent = nanoseconds.bit_length() - 1
+                    stats.counts[exponent * 8 + ((nanoseconds >> (exponent - 3)) & 7)] += 1
+                stats.sum += nanoseconds
+        if onMetaclass:
+            # The metaclass method runs for every class using that metaclass, but only calls for cls are recorded
+            measured = wrapper
+            @functools.wraps(function)
+            def wrapper(klass, *args, **kwargs):
+                if klass is cls:
+                    return measured(klass, *args, **kwargs)
+                return function(klass, *args, **kwargs)
+        if isClassMethod:
+            wrapper = classmethod(wrapper)
+        elif isStatic or methodName == "__new__":
+            wrapper = staticmethod(wrapper)
+        inherited = methodName not in owner.__dict__
+        setattr(owner, methodName, wrapper)
+        self.__originals.append((owner, methodName, None if inherited else original))
+    # Puts every original method back, after this there is no cost left from the instrumentation
+    def disable(self):
+        while self.__originals:
+            owner, methodName, original = self.__originals.pop()
+            if original is None: # The method was inherited, so removing the wrapper makes it visible again
+                delattr(owner, methodName)
+            else:
+                setattr(owner, methodName, original)
+    # Must be called with the lock held. Adds the counters of the threads which have finished into __finished,
+    # so __stats only keeps the counters of live threads.
+    def __mergeFinished(self):
+        live = []
+        for entry in self.__stats:
+            target, key, stats, thread = entry
+            if thread.is_alive():
+                live.append(entry)
+            else:
+                total = self.__finished.get((target, key))
+                if total is None:
+                    total = self.__finished[(target, key)] = CallStats()
+                total.add(stats)
+        self.__stats[:] = live
+        self.__compactAt = max(64, 2 * len(live))
+    # Adds up the counters of all the threads. A thread which is recording at the same time may be missing its
+    # last call or two, which is fine for monitoring.
+    def snapshot(self):
+        merged = {} # (target name, key) -> CallStats of all the threads
+        with self.__lock:
+            self.__mergeFinished()
+            allStats = [(target, key, stats) for target, key, stats, thread in self.__stats]
+            allStats.extend((target, key, stats) for (target, key), stats in self.__finished.items())
+            for target, key, stats in allStats:
+                row = merged.get((target, key))
+                if row is None:
+                    row = merged[(target, key)] = CallStats()
+                row.add(stats)
+        histograms = {}
+        for (target, key), row in merged.items():
+            histogram = histograms[(target, key)] = Histogram()
+            histogram.counts, histogram.total, histogram.sum = row.counts, sum(row.counts), row.sum
+        return [{
+            "target": target,
+            "key": key,
+            "calls": row.calls,
+            "created": row.created,
+            "errors": row.errors,
+            "meanNanoseconds": histograms[(target, key)].sum / histograms[(target, key)].total if row.calls else 0.0,
+            "p50Nanoseconds": histograms[(target, key)].percentile(50),
+            "p99Nanoseconds": histograms[(target, key)].percentile(99),
+        } for (target, key), row in merged.items()]
+    def exportJson(self, path):
+        with open(path, "w") as file:
+            json.dump(self.snapshot(), file, indent = 2)
+    def exportPrometheus(self, path):
+        lines = []
+        for row in self.snapshot():
+            labels = f'target="{row["target"]}",key="{row["key"] if row["key"] is not None else ""}"'
+            lines.append(f"pattern_calls_total{{{labels}}} {row['calls']}")
+            lines.append(f"pattern_created_total{{{labels}}} {row['created']}")
+            lines.append(f"pattern_errors_total{{{labels}}} {row['errors']}")
+            lines.append(f'pattern_latency_nanoseconds{{{labels},quantile="0.5"}} {row["p50Nanoseconds"]}')
+            lines.append(f'pattern_latency_nanoseconds{{{labels},quantile="0.99"}} {row["p99Nanoseconds"]}')
+        with open(path, "w") as file:
+            file.write("\n".join(lines) + "\n")
+ 
+# Client Code
+if __name__ == "__main__":
+    import os, runpy, tempfile
+ 
+    # The examples of the pattern files are inside 'if __name__ == "__main__":', so loading them only defines the classes
+    folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Creational Design Patterns")
+    factory = runpy.run_path(os.path.join(folder, "Factory Design Pattern.py"))
+    abstractFactory = runpy.run_path(os.path.join(folder, "Abstract Factory Design Pattern.py"))
+    ShapeFactory, CarTypeFactory = factory["ShapeFactory"], abstractFactory["CarTypeFactory"]
+ 
+    instrumentation = Instrumentation()
+    instrumentation.instrument(ShapeFactory, "getShape", keyed = True)
+    instrumentation.instrument(CarTypeFactory, "getCarType", keyed = True)
+    instrumentation.instrument(factory["KeyedShapeFactory"], "getShape", keyed = True)
+    for i in range(1000):
+        ShapeFactory.getShape("Circle")
+        ShapeFactory.getShape("Hexagon") # Not registered, so it is counted as a call but not as a created object
+        CarTypeFactory.getCarType("SUV")
+        try:
+            factory["KeyedShapeFactory"].getShape(-1) # Raises ValueError, so it is counted as an error
+        except ValueError:
+            pass
+    # HouseBuilder.build() is inherited by the HouseBuilder of the batch example, and a Singleton has no
+    # __new__ of its own, its instance is created by SingletonMeta.__call__
+    builder = runpy.run_path(os.path.join(folder, "Builder Design Pattern.py"))
+    singleton = runpy.run_path(os.path.join(folder, "Singleton Design Pattern.py"))
+    instrumentation.instrument(builder["HouseBuilder"], "build")
+    instrumentation.instrument(singleton["Singleton"], "__call__")
+    def buildHouses():
+        for i in range(100):
+            builder["HouseBuilder"]().setStories(1).setDoorType("Single").setRoofType("Pointing").build()
+            singleton["Singleton"]()
+    threads = [threading.Thread(target = buildHouses) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    singleton["Logger"]() # Uses the same metaclass, but is not recorded
+    for row in instrumentation.snapshot(): # The counters of the four finished threads are added into one row each
+        print(row)
+    instrumentation.exportJson(os.path.join(tempfile.gettempdir(), "patterns.json"))
+    instrumentation.exportPrometheus(os.path.join(tempfile.gettempdir(), "patterns.prom"))
+    instrumentation.disable()
+ 
+    # Now lets compare the cost of getShape() with the instrumentation disabled and enabled. The wrapper is still
+    # Python code which runs on every call (two clock reads, the thread's counters, the histogram bucket), so it
+    # adds a few hundred nanoseconds per call; for cheap methods like getShape() that is a large share.
+    count = 100000
+    start = time.perf_counter()
+    for i in range(count):
+        ShapeFactory.getShape("Circle")
+    disabled = time.perf_counter() - start
+    instrumentation.instrument(ShapeFactory, "getShape", keyed = True)
+    start = time.perf_counter()
+    for i in range(count):
+        ShapeFactory.getShape("Circle")
+    enabled = time.perf_counter() - start
+    instrumentation.disable()
+    print(f"disabled: {disabled * 1e9 / count:.0f}ns per call, enabled: {enabled * 1e9 / count:.0f}ns per call")
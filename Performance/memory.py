@@ -0,0 +1,133 @@
+'''
+Memory Profiling of the Design Patterns:
+ 
+When millions of House, Student, car and shape objects are alive, we want to know how much memory they take
+and which factory call, builder recipe or prototype created them. This file has two ways of measuring that:
+ 
+--- deepSizeOf() walks through an object and everything it refers to (its attributes, its __slots__, the items
+of lists, dicts, sets and tuples) and adds up sys.getsizeof() of each of them. Objects which are shared, like
+the same string used by many houses, are only counted once. The references are found using
+gc.get_referents(), because reading obj.__dict__ would create a real dictionary for every object whose
+attributes Python 3.11+ keeps inline, and make the objects we measure bigger.
+--- MemoryProfiler uses tracemalloc, which records where (file and line) every block of memory was allocated.
+profile.track("label") takes a snapshot before and after a block of code, so the memory that is still
+allocated after the block (i.e. retained) is attributed to that label. It can also list the top allocation
+sites, and diff two snapshots to find code which keeps allocating memory and never releases it (a leak).
+The memory tracemalloc allocates for itself (e.g. for its snapshots) is filtered out.
+ 
+The results can be exported as JSON.
+ 
+'''
+ 
+import gc, json, os, sys, tracemalloc, types
+from contextlib import contextmanager
+ 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import design_patterns
+ 
+# Objects which belong to the program and not to one product, so they are never counted
+_SKIPPED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+ 
+def deepSizeOf(obj, seen = None):
+    seen = set() if seen is None else seen # Pass the same set to count shared objects only once across calls
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SKIPPED):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        # The items of containers, the keys and values of dicts, and the attributes and slots of objects (their
+        # class is skipped above). Objects like strings and numbers do not refer to anything and return [].
+        stack.extend(gc.get_referents(current))
+    return total
+ 
+class MemoryProfiler:
+    def __init__(self, frames = 1):
+        self.frames = frames # Number of stack frames tracemalloc keeps for every allocation
+        self.labels = {} # label -> {"retainedBytes", "blocks", "deepSize"}
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+    def stop(self):
+        tracemalloc.stop()
+    def snapshot(self):
+        return MemoryProfiler.__withoutTracemalloc(tracemalloc.take_snapshot())
+    # Removes the memory allocated by tracemalloc itself and by the import machinery
+    @staticmethod
+    def __withoutTracemalloc(snapshot):
+        return snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+    # Attributes the memory which is still allocated at the end of the block to label. If the block stores its
+    # products in the list given by "as", their deep size is recorded as well.
+    @contextmanager
+    def track(self, label):
+        self.start()
+        products = []
+        before = self.snapshot()
+        yield products
+        after = self.snapshot()
+        retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+        entry = self.labels.setdefault(label, {"retainedBytes": 0, "blocks": 0, "deepSize": 0})
+        entry["retainedBytes"] += retained
+        entry["blocks"] += blocks
+        entry["deepSize"] += deepSizeOf(products)
+    # Returns the lines of code which have allocated the most memory that is still alive
+    def topSites(self, snapshot = None, limit = 10):
+        snapshot = MemoryProfiler.__withoutTracemalloc(snapshot) if snapshot is not None else self.snapshot()
+        return [{"site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", "bytes": stat.size, "blocks": stat.count}
+                for stat in snapshot.statistics("lineno")[:limit]]
+    # Returns the lines of code whose memory grew the most between two snapshots
+    @staticmethod
+    def diff(before, after, limit = 10):
+        before, after = MemoryProfiler.__withoutTracemalloc(before), MemoryProfiler.__withoutTracemalloc(after)
+        return [{"site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", "bytesGrowth": stat.size_diff, "blocksGrowth": stat.count_diff}
+                for stat in after.compare_to(before, "lineno")[:limit] if stat.size_diff > 0]
+    def report(self, limit = 10):
+        return {"labels": self.labels, "topSites": self.topSites(limit = limit)}
+    def exportJson(self, path, limit = 10):
+        with open(path, "w") as file:
+            json.dump(self.report(limit), file, indent = 2)
+ 
+# Client Code
+if __name__ == "__main__":
+    import tempfile
+ 
+    profiler = MemoryProfiler()
+    kept = [] # Keeps the products alive, so that their memory is retained
+    for key in ("Circle", "Square", "Triangle"): # Per factory key
+        with profiler.track(f"ShapeFactory.getShape({key!r})") as products:
+            products.extend(design_patterns.ShapeFactory.getShape(key) for i in range(10000))
+        kept.append(products)
+    director = design_patterns.Director(design_patterns.HouseBuilder())
+    for recipe in (design_patterns.Director.ONE_STORY_HOUSE, design_patterns.Director.TWO_STORY_HOUSE): # Per builder recipe
+        with profiler.track(f"Director.build_many({recipe})") as products:
+            products.extend(director.build_many(recipe, 10000))
+        kept.append(products)
+    with profiler.track("Student('John').clone_many") as products: # Per prototype
+        products.extend(design_patterns.Student("John", 23, 1, ["Maths"]).clone_many(10000))
+    kept.append(products)
+    for label, entry in profiler.labels.items():
+        print(f"{label:50} {entry['retainedBytes'] / 10000:6.1f} bytes per object retained, {entry['deepSize'] / 10000:6.1f} bytes deep size")
+ 
+    # Finding a leak: a cache which keeps growing
+    leakyCache = []
+    def leakyBuild():
+        house = director.build_one_story_house()
+        leakyCache.append(house) # Never removed
+        return house
+    before = profiler.snapshot()
+    for i in range(10000):
+        leakyBuild()
+    after = profiler.snapshot()
+    for row in MemoryProfiler.diff(before, after, limit = 3):
+        print(row) # The line of leakyCache.append() and of House.__init__ show up at the top
+    path = os.path.join(tempfile.gettempdir(), "patterns_memory.json")
+    profiler.exportJson(path)
+    print(f"Report written to {path}")
+    profiler.stop()
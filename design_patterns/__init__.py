@@ -0,0 +1,101 @@
+'''
+Importable access to the Design Pattern examples:
+ 
+The examples live in files like "Creational Design Patterns/Factory Design Pattern.py", which cannot be
+imported with a normal import statement because of the spaces in their names. This package loads them by
+their path instead, so we can write:
+ 
+    import design_patterns
+    shape = design_patterns.ShapeFactory.getShape("Circle")
+    pool = design_patterns.thread_pool.WorkerPool(workers = 4)
+ 
+--- Nothing is loaded by "import design_patterns" itself. A file is only loaded the first time one of its
+names is used (through the module level __getattr__ below), so importing the package is almost free and
+we only pay for the examples we really use.
+--- The examples of every file are inside 'if __name__ == "__main__":', so loading a file does not print
+anything or start any threads.
+--- The product keys used by the keyed factories (ShapeType, CarType, Company) are defined once in the normal
+submodule design_patterns.keys, which the factory files import.
+--- Many files define the same class several times (Singleton, House, ShapeInterface ...), each time as
+the next step of the explanation. Only the last, final definition is exported by this package.
+ 
+'''
+ 
+import os, sys
+ 
+_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+ 
+# Submodule name -> file of the example, relative to the repository root
+_SUBMODULES = {
+    "factory": "Creational Design Patterns/Factory Design Pattern.py",
+    "abstract_factory": "Creational Design Patterns/Abstract Factory Design Pattern.py",
+    "builder": "Creational Design Patterns/Builder Design Pattern.py",
+    "prototype": "Creational Design Patterns/Prototype Design Pattern.py",
+    "singleton": "Creational Design Patterns/Singleton Design Pattern.py",
+    "object_pool": "Creational Design Patterns/Object Pool Design Pattern.py",
+    "multithreading": "Multi-Threading in Python/Multi-threading in Python.py",
+    "thread_pool": "Multi-Threading in Python/Thread Pool in Python.py",
+    "locks": "Multi-Threading in Python/Locks in Python.py",
+    "asyncio_workers": "Multi-Threading in Python/Asyncio in Python.py",
+    "multiprocessing_workers": "Multi-Threading in Python/Multi-processing in Python.py",
+    "pipeline": "Multi-Threading in Python/Pipeline in Python.py",
+    "work_stealing": "Multi-Threading in Python/Work Stealing in Python.py",
+}
+ 
+# Final version of every class -> submodule which defines it. The keys are taken from design_patterns.keys itself,
+# so they are the same classes whichever factory file is loaded, and using them does not load any factory.
+_EXPORTS = {
+    "ShapeType": "keys", "CarType": "keys", "Company": "keys", "ProductKey": "keys",
+    "ShapeInterface": "factory", "ShapeFactory": "factory", "KeyedShapeFactory": "factory",
+    "CarInterface": "abstract_factory", "CarTypeFactory": "abstract_factory",
+    "SUVFactory": "abstract_factory", "SedanFactory": "abstract_factory", "CompiledCarFactory": "abstract_factory",
+    "KeyedCarTypeFactory": "abstract_factory",
+    "KeyedSUVFactory": "abstract_factory", "KeyedSedanFactory": "abstract_factory",
+    "House": "builder", "HouseBuilder": "builder", "HouseBatch": "builder", "Director": "builder",
+    "FrozenHouseBuilder": "builder", "FrozenDirector": "builder",
+    "ImmutableHouse": "builder", "HouseCache": "builder", "MemoizingDirector": "builder", "MemoizingHouseBuilder": "builder",
+    "Prototype": "prototype", "Student": "prototype", "PrototypeRegistry": "prototype", "PrototypeSnapshot": "prototype",
+    "Singleton": "singleton", "SingletonMeta": "singleton", "LazySingleton": "singleton",
+    "ThreadScopedSingleton": "singleton", "ProcessScopedSingleton": "singleton", "ContextScopedSingleton": "singleton",
+    "ObjectPool": "object_pool", "PooledFactory": "object_pool",
+    "WorkerPool": "thread_pool",
+    "TimedLock": "locks", "StripedLock": "locks", "ReadWriteLock": "locks", "LockProfiler": "locks",
+    "TaskRunner": "asyncio_workers", "AsyncTimedLock": "asyncio_workers", "AsyncTimedSemaphore": "asyncio_workers",
+    "ProcessWorkerPool": "multiprocessing_workers",
+    "Pipeline": "pipeline",
+    "WorkStealingScheduler": "work_stealing", "CancellationToken": "work_stealing",
+}
+ 
+__all__ = sorted(_SUBMODULES) + sorted(_EXPORTS)
+ 
+def _load(name):
+    if name not in _SUBMODULES: # A normal submodule of this package, like keys
+        import importlib
+        return importlib.import_module(f".{name}", __name__)
+    fullName = f"{__name__}.{name}"
+    module = sys.modules.get(fullName)
+    if module is None:
+        import importlib.util # Imported here, so that "import design_patterns" itself stays cheap
+        spec = importlib.util.spec_from_file_location(fullName, os.path.join(_ROOT, _SUBMODULES[name]))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[fullName] = module # Registered before running it, so pickle and multiprocessing can find it by name
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[fullName]
+            raise
+        globals()[name] = module # Next time the attribute is found directly, without calling __getattr__
+    return module
+ 
+# Called only for names which are not found in this module yet
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return _load(name)
+    if name in _EXPORTS:
+        value = getattr(_load(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+ 
+def __dir__():
+    return __all__
@@ -0,0 +1,58 @@
+'''
+Product keys shared by all our factories:
+ 
+ShapeFactory, SUVFactory, SedanFactory and CarTypeFactory take free form strings, so a typo silently returns
+None. Here every product type is a typed key, an IntEnum. External strings are parsed into keys once, at the
+boundary of the program, and a wrong string fails right there with a clear error. The values of every key type
+are 0, 1, 2 ..., so the keyed factories can use them directly as the index of a dispatch list.
+ 
+The member names are the same as the old string keys, so key.name can still be passed to the string based
+factories.
+ 
+'''
+ 
+from enum import IntEnum
+ 
+class ProductKey(IntEnum):
+    # Turns an external string into a key with a single dictionary lookup, raising ValueError for an unknown name
+    @classmethod
+    def parse(cls, text):
+        if isinstance(text, cls):
+            return text
+        key = cls.__members__.get(text) if isinstance(text, str) else None
+        if key is None:
+            raise ValueError(f"Unknown {cls.__name__} {text!r}, expected one of: {', '.join(cls.__members__)}")
+        return key
+ 
+class ShapeType(ProductKey):
+    Circle = 0
+    Square = 1
+    Rectangle = 2
+    Triangle = 3
+ 
+class CarType(ProductKey):
+    SUV = 0
+    Sedan = 1
+ 
+class Company(ProductKey):
+    RangeRover = 0
+    Volvo = 1
+    Benz = 2
+    Audi = 3
+ 
+# Constructor which is stored in a dispatch list for a key without a product (e.g. a Benz SUV), so the
+# factories never have to check for a missing entry.
+def missingProduct(kind, key):
+    def constructor():
+        raise LookupError(f"No {kind} is registered for {key.name}")
+    return constructor
+ 
+# Raises the error for a key which a keyed factory could not use, and returns if the key is valid, so a factory
+# can check all its keys with it. A string raises TypeError, as it has to be parsed with keyType.parse() first,
+# and a number out of range raises ValueError, e.g. "6 is not a valid Company".
+def invalidKey(keyType, key):
+    if isinstance(key, str):
+        raise TypeError(f"Expected a {keyType.__name__} key, not the string {key!r}, parse it with {keyType.__name__}.parse({key!r})")
+    if not isinstance(key, int):
+        raise TypeError(f"Expected a {keyType.__name__} key, not {type(key).__name__}")
+    keyType(key)